@@ -9,10 +9,12 @@ from .coordinator import BSKDataUpdateCoordinator
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .bsk_api import BSKZephyrLanClient, InvalidAuthError
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from .device_session import async_device_session_factory
+from .const import CONF_DEVICES, CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL
+from .openmetrics import async_register_metrics_view
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,24 +39,36 @@ type BSKZephyrConfigEntry = ConfigEntry[BSKZephyrData]  # noqa: F821
 async def async_setup_entry(hass: HomeAssistant, entry: BSKZephyrConfigEntry) -> bool:
     """Set up BSK Zephyr from a config entry."""
 
-    client = BSKZephyrLanClient(
-        async_get_clientsession(hass),
-        entry.data[CONF_HOST],
-    )
-
+    # entries created before the multi-device support only have the host
+    devices = entry.data.get(CONF_DEVICES) or {entry.unique_id: entry.data[CONF_HOST]}
+    # every client owns a dedicated connection pool to its device, kept open
+    # across the slowest polls
+    max_poll_interval = entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+    session_factory = async_device_session_factory(hass)
+    clients = {
+        device_id: BSKZephyrLanClient(None, host, max_poll_interval, session_factory)
+        for device_id, host in devices.items()
+    }
+
+    coordinator = BSKDataUpdateCoordinator(hass, entry, clients)
+    # entities start from the last stored snapshot, only the devices without
+    # one are fetched before going on
     try:
-        await client.login()
+        await coordinator.async_initial_data()
     except InvalidAuthError as err:
+        await coordinator.async_shutdown()
         raise ConfigEntryAuthFailed("Credentials error from BSK Zephyr") from err
-
-    coordinator = BSKDataUpdateCoordinator(hass, entry, client)
-    await coordinator.async_config_entry_first_refresh()
+    except Exception as err:
+        await coordinator.async_shutdown()
+        raise ConfigEntryNotReady(str(err)) from err
 
     _LOGGER.debug("Setup device's coordinator")
 
     entry.runtime_data = BSKZephyrData(coordinator=coordinator)
 
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    # one scrape target for the devices of all the entries
+    async_register_metrics_view(hass)
 
     # Reload entry when its updated.
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -68,4 +82,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: BSKZephyrConfigEntry) -
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     """Reload the config entry when it changed."""
+    coordinator = entry.runtime_data.coordinator
+    if coordinator.config == dict(entry.data) and coordinator.options == dict(entry.options):
+        # the coordinator already applied the change, e.g. a device new address
+        return
     await hass.config_entries.async_reload(entry.entry_id)
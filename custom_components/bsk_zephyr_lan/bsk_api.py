@@ -1,15 +1,32 @@
-import re, json
+import asyncio
+import json
 import logging
+import time
 
 from enum import Enum
 from http import HTTPStatus
 from datetime import datetime
-from packaging import version
+from collections.abc import Callable
+from typing import Any
 
-from aiohttp import ClientResponseError, ContentTypeError
+from aiohttp import ClientConnectionError, ClientResponseError, ClientTimeout, ContentTypeError, TCPConnector, TraceConfig
 from aiohttp.client import ClientResponse, ClientSession
 from pydantic import BaseModel
 
+from .capabilities import DeviceCapabilities, resolve_capabilities
+from .circuit_breaker import CircuitBreaker
+from .command_planner import DeviceCommand, plan_commands
+from .metrics import ClientMetrics
+from .request_scheduler import PRIORITY_COMMAND, PRIORITY_POLL, RequestScheduler
+from .status_parser import StatusPageParser
+from .transport import (
+    HtmlStatusTransport,
+    InvalidStatusError,
+    StatusTransport,
+    async_detect_transport,
+    transport_from_name,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 class ZephyrException(Exception):
@@ -18,6 +35,19 @@ class ZephyrException(Exception):
 class InvalidAuthError(ZephyrException):
     """Invalid authentication"""    
 
+class CannotConnectError(ZephyrException):
+    """Device not reachable"""
+
+class DeviceUnavailableError(CannotConnectError):
+    """Device not contacted, it stopped answering and the next probe is not due yet"""
+
+class CommandRejectedError(ZephyrException):
+    """The device answered a command with an HTTP error"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
 
 class FanMode(str, Enum):
     supply = "supply"
@@ -67,120 +97,299 @@ class ZephyrDevice(BaseModel):
 
 
 
+# Creates a session owning its connector: (TCPConnector options, ClientSession options)
+SessionFactory = Callable[..., ClientSession]
+
+
+def default_session_factory(connector_options: dict[str, Any], **options: Any) -> ClientSession:
+    return ClientSession(connector=TCPConnector(**connector_options), **options)
+
+
 class BSKZephyrLanClient:
     HUMID_BOOST_DISABLED_LEVEL = 99
+    # Used by the session the client creates for itself
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 10
+    KEEPALIVE_TIMEOUT = 30
+    # Idle time kept on top of the poll interval, covers the fleet slot shift
+    # and the fetch itself
+    KEEPALIVE_MARGIN = 10
+    # persistent_data key of the transport detected for the device
+    STATUS_TRANSPORT_KEY = "status_transport"
+    # Commands are planned on a status read at most this long ago, seconds
+    STATE_MAX_AGE = 10
 
     def __init__(
         self,
-        session: ClientSession,
+        session: ClientSession | None,
         host: str | None = None,
+        poll_interval: float | None = None,
+        session_factory: SessionFactory | None = None,
     ) -> None:
-        self._aiohttp_session: ClientSession = session
+        """Without a session the client owns a single-connection pool to the device.
+
+        With poll_interval, the longest time between two polls, its connection
+        is kept open across the polls. session_factory creates that pool, e.g.
+        with the resolver and user agent of Home Assistant, from the connector
+        and session options.
+        """
+        self._aiohttp_session: ClientSession | None = session
+        self._session_factory = session_factory or default_session_factory
+        self.keepalive_timeout = (
+            self.KEEPALIVE_TIMEOUT
+            if poll_interval is None
+            else max(self.KEEPALIVE_TIMEOUT, poll_interval + self.KEEPALIVE_MARGIN)
+        )
+        self._owns_session = session is None
+        self.connection_stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+        }
         self._host = host
         self._host_url = f"http://{host}"
-        self._raw_html = ""
         self._raw_data = {}
         self._device = None
+        self._models: dict[str, ZephyrDevice] = {}
+        self._fingerprint: tuple = ()
+        self._parser = StatusPageParser()
+        # detected at the first fetch, or restored from persistent_data
+        self._transport: StatusTransport | None = None
+        # flags of the model and firmware, resolved once per model and version
+        self.capabilities: DeviceCapabilities | None = None
+        self._capabilities_for: tuple[str, str] | None = None
+        # one HTTP exchange at a time, commands before polls
+        self._scheduler = RequestScheduler()
+        # stop hammering a device that dropped off the network
+        self.circuit_breaker = CircuitBreaker(f"BSK Zephyr {host}")
+        # latency, errors and bytes of the exchanges, per endpoint
+        self.metrics = ClientMetrics()
+        # fields changed by a command and not confirmed by the device response
+        self._unconfirmed_fields: set[str] = set()
         self.persistent_data = {}
-
+        # monotonic time of the last status read, None for restored data
+        self._state_read_at: float | None = None
+        self.state_max_age = self.STATE_MAX_AGE
+
+
+    def _get_session(self) -> ClientSession:
+        if self._aiohttp_session is None or self._aiohttp_session.closed:
+            # one keep-alive connection per device, a hung unit only holds its own socket
+            self._aiohttp_session = self._session_factory(
+                {"limit": 1, "limit_per_host": 1, "keepalive_timeout": self.keepalive_timeout},
+                timeout=ClientTimeout(
+                    total=None, connect=self.CONNECT_TIMEOUT, sock_read=self.READ_TIMEOUT
+                ),
+                trace_configs=[self._trace_config()],
+            )
+        return self._aiohttp_session
+
+    def _trace_config(self) -> TraceConfig:
+        stats = self.connection_stats
+
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats["connections_reused"] += 1
+
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def close(self) -> None:
+        """Close the connection pool if the client created it."""
+        if self._owns_session and self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+
+    async def async_set_host(self, host: str) -> None:
+        """Follow the device to a new address."""
+        self._host = host
+        self._host_url = f"http://{host}"
+        self.circuit_breaker = CircuitBreaker(f"BSK Zephyr {host}")
+        # drop the keep-alive connection to the old address
+        await self.close()
 
     async def _get(self, path, headers=None, params=None, asText=True):
         url = self._host_url + path
-        async with self._aiohttp_session.get(url, headers=headers, **(params or {})) as r:
-            r.raise_for_status()
-            if asText:
-                return await r.text()
-            return await r.json()
+
+        async def request():
+            async with self._get_session().get(url, headers=headers, **(params or {})) as r:
+                # text() and json() decode the body already read
+                self.metrics.received("GET", path, len(await r.read()))
+                r.raise_for_status()
+                if asText:
+                    return await r.text()
+                return await r.json()
+
+        return await self._run(self.metrics.timed("GET", path, request), PRIORITY_POLL)
 
     async def _post(self, path, data=None, headers=None, params=None):
         url = self._host_url + path
-        async with self._aiohttp_session.post(url, data=data, headers=headers, **(params or {})) as r:
-            if r.status >= 400:
-                text = await r.text()
-                raise Exception(f"HTTP {r.status} on {url}. Data: {data}. Response: {text}")
-            if path == "/off":
-                self._raw_data["humidity_boost_running"] = False
-            return await r.json()
 
+        async def request():
+            async with self._get_session().post(url, data=data, headers=headers, **(params or {})) as r:
+                self.metrics.received("POST", path, len(await r.read()))
+                if r.status >= 400:
+                    text = await r.text()
+                    raise CommandRejectedError(
+                        r.status, f"HTTP {r.status} on {url}. Data: {data}. Response: {text}"
+                    )
+                if path == "/off":
+                    self._raw_data["humidity_boost_running"] = False
+                return await r.json(content_type=None)
+
+        return await self._run(self.metrics.timed("POST", path, request), PRIORITY_COMMAND)
+
+    async def _run(self, request, priority):
+        """Run request through the scheduler, unless the circuit is open."""
+        breaker = self.circuit_breaker
+        if not breaker.allow_request():
+            raise DeviceUnavailableError(
+                f"BSK Zephyr {self._host} is unreachable, next retry in {breaker.retry_in:.0f} s"
+            )
+        try:
+            result = await self._scheduler.run(request, priority)
+        except (ClientConnectionError, TimeoutError) as err:
+            breaker.record_failure(err)
+            raise CannotConnectError(
+                f"BSK Zephyr {self._host} not reachable: {err or type(err).__name__}"
+            ) from err
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except Exception:
+            # the device answered, even if with an error
+            breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _command(self, path, data=None, **expected) -> dict:
+        """Send a command and merge the state reported in its response.
+
+        Fields in expected that the response does not report are applied
+        optimistically and marked as needing a status page refresh.
+        """
+        try:
+            response = await self._post(path, data)
+        except ValueError:
+            # Not a JSON body, nothing reported by the device
+            response = None
+        reported = {}
+        if isinstance(response, dict):
+            reported = self._parser.parse_mapping(response)
+            self._raw_data.update(reported)
+        for key, value in expected.items():
+            if key not in reported:
+                self._raw_data[key] = value
+                self._unconfirmed_fields.add(key)
+        return reported
+
+    @property
+    def host(self) -> str | None:
+        return self._host
+
+    @property
+    def device_id(self) -> str | None:
+        """Device id read from the status page, None before the first fetch."""
+        return self._raw_data.get("device_id")
+
+    @property
+    def refresh_required(self) -> bool:
+        """Return True if a command changed fields the device has not confirmed."""
+        return bool(self._unconfirmed_fields)
+
+
+    def snapshot(self) -> dict:
+        """Raw data to persist, the derived enums are rebuilt on restore."""
+        return {
+            key: value
+            for key, value in self._raw_data.items()
+            if not isinstance(value, Enum)
+        }
+
+    async def restore_snapshot(self, snapshot: dict) -> dict[str, ZephyrDevice]:
+        """Build the devices from a persisted snapshot, without contacting the device."""
+        self._raw_data = dict(snapshot)
+        # the next fetch must rebuild the models
+        self._fingerprint = ()
+        return await self.list_devices(True)
 
     async def login(self) -> str:
         #no auth required, try to load device info
         await self.list_devices()
 
-    def _parse_value(self, key: str, value: str):
-        self._last_value_unit = None
-        """Converte stringhe in numeri quando possibile"""
-        v = value.strip()
-        if key in ('power', 'buzzer', 'humidity_boost_running'):
-            return to_bool(v)
-        for unit in ["°C", "°F", "%", "dBm", "h"]:
-            if v.endswith(unit) and v.endswith(f" {unit}"):
-                try:                    
-                    numeric_part = float(v.replace(unit, "").strip())
-                    if unit in ("h"):
-                        numeric_part = int(numeric_part)
-                    self._last_value_unit = unit
-                    return numeric_part
-                except ValueError:
-                    return v
-                break
-        if key in ('fan_speed', 'humidity_boost_level', 'humidity_boost_level_raw', 'hygiene_status'):
-            try:                    
-                return int(v)
-            except ValueError:
-                return v
-        # altrimenti stringa
-        return v
+    @property
+    def status_transport(self) -> str | None:
+        return self._transport and self._transport.name
 
     async def fetch_device_data(self):
-        #for now data are only in html
         try:
-            self._raw_html = await self._get("", asText=True)
+            data = await self._fetch_status()
         except ClientResponseError as err:
             if err.status == HTTPStatus.UNAUTHORIZED:
                 raise InvalidAuthError(err)
             else:
                 raise ZephyrException(err)
-        # Find all tuple <b>Key:</b> Value
-        pattern =  r"<p><b>([^<:]+):<\/b>(.*?)<\/p>"
-        matches = re.findall(pattern, self._raw_html)
-        valid = False
-        for okey, value in matches:
-            # Convert 'Fan Speed' -> 'fan_speed'
-            key = okey.strip().lower().replace(" ", "_")
-            if key in ('ssid', 'rssi', 'ip'):
-                key = f"wifi_{key}"
-            if key in ('version', 'model'):
-                key = f"device_{key}"
-            if (key == "set_humidity"):
-                key = "humidity_boost_level_raw"
-                self._raw_data["humidity_boost_enabled"] = None
-            if (key == "humidity_boost"):
-                key = "humidity_boost_running"
-            self._raw_data[key] = self._parse_value(key, value)
-            if self._last_value_unit:
-                self._raw_data[f"{key}_unit"] = self._last_value_unit
-            if key in ("fan_speed", "operation_mode"):
-                self._raw_data[f"{key}_enum"] = None
-                valid = True
-        if not valid:
-            raise Exception(f"No valid data received: {self._raw_html}")
+        except InvalidStatusError as err:
+            raise ZephyrException(err)
+        self._raw_data.update(data)
+        self._unconfirmed_fields.clear()
+        self._state_read_at = time.monotonic()
+
+    async def _fetch_status(self) -> dict:
+        """Read the status with the best transport of the device.
+
+        The transport is detected once and saved in persistent_data, a JSON
+        transport that stops working falls back to the status page.
+        """
+        if self._transport is None:
+            self._transport = transport_from_name(
+                self.persistent_data.get(self.STATUS_TRANSPORT_KEY), self._parser
+            )
+        if self._transport is not None:
+            try:
+                return await self._transport.async_fetch(self._get)
+            except (ClientResponseError, ValueError):
+                if self._transport.name == HtmlStatusTransport.name:
+                    raise
+                _LOGGER.info(
+                    "%s on %s not available anymore, reading the status page",
+                    self._transport.name, self._host,
+                )
+                self._transport = HtmlStatusTransport(self._parser)
+                self.persistent_data[self.STATUS_TRANSPORT_KEY] = self._transport.name
+
+        html = HtmlStatusTransport(self._parser)
+        data = await html.async_fetch(self._get)
+        if self._transport is None:
+            self._transport = await async_detect_transport(self._get, self._parser, data)
+            _LOGGER.debug("Status of %s read through %s", self._host, self._transport.name)
+            self.persistent_data[self.STATUS_TRANSPORT_KEY] = self._transport.name
+        return data
 
     async def list_devices(self, from_cache: bool = False) -> dict[str, ZephyrDevice]:
         try:
             if not from_cache:
                 await self.fetch_device_data()
             data = self._raw_data
+            model_version = (data["device_model"], data["device_version"])
+            if model_version != self._capabilities_for:
+                # at the first read, then only after a firmware update
+                self.capabilities = resolve_capabilities(*model_version)
+                self._capabilities_for = model_version
             if not "device_name" in data:
                 data["_id"] = data["device_id"]
                 data["group_id"] = data["device_id"] + "_group"
                 data["group_title"] = data["device_model"]
-                data["device_name"] = data["device_model"]
-                if data["device_name"] == "BSK-Zephyr-160MM-V2_4MB":
-                    data["device_name"] = "BSK-Zephyr"
-                if "BSK-Zephyr-Mini" in data["device_name"]:
-                    data["device_name"] = "BSK-Zephyr-Mini"
-            data["updated_at"] = datetime.utcnow().isoformat()
+                data["device_name"] = self.capabilities.device_name
             data["fan_speed_enum"] = fan_speed_value_to_enum(int(data["fan_speed"]))
             data["operation_mode_enum"] = parse_fan_mode(data["operation_mode"])
 
@@ -194,13 +403,22 @@ class BSKZephyrLanClient:
             else:
                 data["humidity_boost_level"] = self.persistent_data.get("humidity_boost_level_last", 60)
 
+            # reuse the previous instance if the device reported the same values
+            fingerprint = tuple(item for item in data.items() if item[0] != "updated_at")
+            if self._models and fingerprint == self._fingerprint:
+                return self._models
+            self._fingerprint = fingerprint
+
+            data["updated_at"] = datetime.utcnow().isoformat()
             # Crea istanza Pydantic
             self._device = ZephyrDevice(**data)
             models = {}
             models[self._device.group_id] = self._device
+            self._models = models
             return models
         except Exception as err:
-            _LOGGER.exception("Error in list_devices")
+            # the coordinator reports the failure, the circuit breaker the outages
+            _LOGGER.debug("Error in list_devices: %s", err)
             raise
 
     async def control_device(
@@ -213,76 +431,59 @@ class BSKZephyrLanClient:
         humidity_boost_enabled: bool | None = None,
         humidity_boost_level: int | None = None,
         buzzer: bool | None = None,
-    ):
-        #try:
-            if power is not None:
-                await self._post("/on" if power else "/off")
-                self._raw_data["power"] = power
-            if operation_mode_enum:
-                await self._set_operation_mode(groupID, operation_mode_enum)
-            if fan_speed_enum:
-                if isinstance(fan_speed_enum, str):
-                    fan_speed_enum = parse_fan_speed(fan_speed_enum)
-                fan_speed = fan_speed_to_speed_value(fan_speed_enum)
-            if fan_speed:
-                await self._post("/fan", {"speed": fan_speed})
-                self._raw_data["fan_speed"] = fan_speed
-            if humidity_boost_enabled == True:
-                level = int(self._raw_data.get("humidity_boost_level", 60))
-                await self._set_humidity_boost_level(groupID, level)
-            if humidity_boost_enabled == False:
-                await self._set_humidity_boost_level(groupID, self.HUMID_BOOST_DISABLED_LEVEL)
-            if humidity_boost_level is not None:
-                if humidity_boost_level >= self.HUMID_BOOST_DISABLED_LEVEL:
-                    raise Exception(f"humidity_boost_level value {humidity_boost_level} not allowed. Max is {self.HUMID_BOOST_DISABLED_LEVEL - 1}")
-                if self._raw_data["humidity_boost_enabled"]:
-                    await self._set_humidity_boost_level(groupID, humidity_boost_level)
-                else:
-                    self.persistent_data["humidity_boost_level_last"] = humidity_boost_level
-            if buzzer is not None:
-                await self._post("/buzzer", {"state": 1 if buzzer else 0})
-                self._raw_data["buzzer"] = buzzer
-
-
-        #except ClientResponseError as err:
-        #    raise ZephyrException from err
-    def _check_version(self, v):
-        return version.parse(self._raw_data["device_version"]) <= version.parse(v)
-    
-    
-    async def _set_operation_mode(self, groupID: str, mode: FanMode | str):
-        if isinstance(mode, str):
-            mode = parse_fan_mode(mode)
-        if mode == FanMode.cycle:
-            await self._post("/cycle")
-            self._raw_data["operation_mode"] = "cycle"
-        if mode == FanMode.supply:
-            await self._post("/intake")
-            self._raw_data["operation_mode"] = "intake"
-        if mode == FanMode.extract:
-            await self._post("/exhaust")
-            self._raw_data["operation_mode"] = "exhaust"
-
-
-    async def _set_humidity_boost_level(self, groupID: str, level: int):
-        await self._post("/humid", {"level": level})
-        self._raw_data["humidity_boost_level_raw"] = level
-        #version 3.1.5 bug changing humidy set point, not stop boost_running
-        if (self._raw_data["humidity_boost_running"]
-            and self._check_version("3.1.5") and self._raw_data["power"]
-            and level > self._raw_data["humidity"]):
-            await self._post("/off")
-            await self._post("/on")
-
-    
-
-def to_bool(value: str) -> bool:
-    if value == "0":
-        return False
-    if value == "1":
-        return True
-    v = str(value).strip().lower()
-    return v in ("1", "true", "on", "yes")
+    ) -> list[DeviceCommand]:
+        """Bring the device to the requested settings, return the calls sent."""
+        target = {}
+        if power is not None:
+            target["power"] = power
+        if operation_mode_enum:
+            if isinstance(operation_mode_enum, str):
+                operation_mode_enum = parse_fan_mode(operation_mode_enum)
+            target["operation_mode"] = operation_mode_enum.name
+        if fan_speed_enum:
+            if isinstance(fan_speed_enum, str):
+                fan_speed_enum = parse_fan_speed(fan_speed_enum)
+            fan_speed = fan_speed_to_speed_value(fan_speed_enum)
+        if fan_speed:
+            target["fan_speed"] = int(fan_speed)
+        if humidity_boost_enabled == True:
+            target["humidity_boost_level_raw"] = int(self._raw_data.get("humidity_boost_level", 60))
+        if humidity_boost_enabled == False:
+            target["humidity_boost_level_raw"] = self.HUMID_BOOST_DISABLED_LEVEL
+        if humidity_boost_level is not None:
+            if humidity_boost_level >= self.HUMID_BOOST_DISABLED_LEVEL:
+                raise Exception(f"humidity_boost_level value {humidity_boost_level} not allowed. Max is {self.HUMID_BOOST_DISABLED_LEVEL - 1}")
+            if target.get("humidity_boost_level_raw", self._raw_data.get("humidity_boost_level_raw", 100)) < self.HUMID_BOOST_DISABLED_LEVEL:
+                target["humidity_boost_level_raw"] = int(humidity_boost_level)
+            else:
+                self.persistent_data["humidity_boost_level_last"] = humidity_boost_level
+        if buzzer is not None:
+            target["buzzer"] = buzzer
+
+        if (
+            self._state_read_at is None
+            or time.monotonic() - self._state_read_at > self.state_max_age
+        ):
+            # the unit may have been changed from its buttons or the app since,
+            # a setting the cache wrongly reports as set would not be sent
+            await self.fetch_device_data()
+        commands = plan_commands(
+            self._raw_data,
+            target,
+            self.HUMID_BOOST_DISABLED_LEVEL,
+            restart_on_boost_change=self.capabilities.restart_boost_on_level_change,
+        )
+        for command in commands:
+            await self._command(command.path, command.data, **command.expected)
+        return commands
+
+
+def device_changed_fields(old: ZephyrDevice, new: ZephyrDevice) -> set[str]:
+    """Return the names of the fields that differ between two device snapshots."""
+    if old is new:
+        return set()
+    old_values = old.__dict__
+    return {key for key, value in new.__dict__.items() if old_values.get(key) != value}
 
 
 def fan_speed_to_speed_value(speed: FanSpeed) -> int:
@@ -0,0 +1,77 @@
+"""Firmware and model specific behaviour of the BSK Zephyr devices."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """Flags resolved once for a model and firmware version."""
+
+    device_name: str
+    # changing the humidity set point does not stop a running boost, the
+    # device must be switched off and on again
+    restart_boost_on_level_change: bool = False
+
+
+class FirmwareQuirk(NamedTuple):
+    """Flags applied to the firmware versions in versions.
+
+    models limits the quirk to the models containing one of the strings,
+    empty means every model.
+    """
+
+    versions: SpecifierSet
+    flags: dict[str, Any]
+    models: tuple[str, ...] = ()
+
+
+# Applied in order, a later quirk overrides the flags set by an earlier one.
+# The sets match the pre-release builds too, e.g. 3.1.5b1 has the 3.1.5 quirks.
+FIRMWARE_QUIRKS: tuple[FirmwareQuirk, ...] = (
+    FirmwareQuirk(
+        SpecifierSet("<=3.1.5", prereleases=True), {"restart_boost_on_level_change": True}
+    ),
+)
+
+# Name shown for a model, by exact model or by model family (substring)
+MODEL_NAMES: dict[str, str] = {
+    "BSK-Zephyr-160MM-V2_4MB": "BSK-Zephyr",
+}
+MODEL_FAMILIES: tuple[tuple[str, str], ...] = (
+    ("BSK-Zephyr-Mini", "BSK-Zephyr-Mini"),
+)
+
+
+def model_name(model: str) -> str:
+    name = MODEL_NAMES.get(model, model)
+    for family, family_name in MODEL_FAMILIES:
+        if family in name:
+            return family_name
+    return name
+
+
+@lru_cache(maxsize=32)
+def resolve_capabilities(model: str, firmware: str) -> DeviceCapabilities:
+    """Return the capabilities of a model running the firmware version."""
+    flags: dict[str, Any] = {}
+    try:
+        firmware_version = Version(firmware)
+    except InvalidVersion:
+        _LOGGER.debug("Unknown firmware version %s of %s, no quirks applied", firmware, model)
+        firmware_version = None
+    for quirk in FIRMWARE_QUIRKS:
+        if quirk.models and not any(m in model for m in quirk.models):
+            continue
+        if firmware_version is not None and firmware_version in quirk.versions:
+            flags.update(quirk.flags)
+    return DeviceCapabilities(device_name=model_name(model), **flags)
@@ -0,0 +1,123 @@
+"""Circuit breaker for the devices that stop answering."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from enum import Enum
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Consecutive connection failures that open the circuit
+FAILURE_THRESHOLD = 2
+# First wait before probing the device again, doubled at every failed probe
+BASE_DELAY = 10
+MAX_DELAY = 300
+# Random spread of the wait, so devices that dropped together do not retry together
+JITTER = 0.2
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """Stop contacting a device after repeated failures, probe it with backoff.
+
+    closed: requests go through. open: requests fail fast until the retry
+    time. half_open: a single probe request goes through, its result closes
+    or opens the circuit again with a longer delay.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        jitter: float = JITTER,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._delay = base_delay
+        self._retry_at = 0.0
+        self._probing = False
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe, 0 if the circuit is not open."""
+        if self.state != CircuitState.open:
+            return 0
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the device now."""
+        if self.state == CircuitState.closed:
+            return True
+        if self.state == CircuitState.open:
+            if time.monotonic() < self._retry_at:
+                self.rejected += 1
+                return False
+            self.state = CircuitState.half_open
+            _LOGGER.debug("Probing %s again", self.name)
+        if self._probing:
+            # only one probe at a time
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self._probing = False
+        self.failures = 0
+        if self.state != CircuitState.closed:
+            self.state = CircuitState.closed
+            self._delay = self.base_delay
+            _LOGGER.info("%s is reachable again", self.name)
+
+    def record_failure(self, err: Exception) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.state == CircuitState.half_open:
+            self._delay = min(self._delay * 2, self.max_delay)
+            self._open()
+            _LOGGER.debug(
+                "%s still unreachable, next probe in %.0f s: %s",
+                self.name, self.retry_in, err,
+            )
+        elif self.state == CircuitState.closed and self.failures >= self.failure_threshold:
+            self._open()
+            _LOGGER.warning(
+                "%s is unreachable, next probe in %.0f s: %s",
+                self.name, self.retry_in, err,
+            )
+
+    def record_cancelled(self) -> None:
+        """The request was cancelled before completing, another one can probe."""
+        self._probing = False
+
+    def _open(self) -> None:
+        self.state = CircuitState.open
+        self.opened += 1
+        delay = self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._retry_at = time.monotonic() + delay
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in": round(self.retry_in, 1),
+        }
@@ -0,0 +1,105 @@
+"""Per-field last-value-wins debouncing of the setting commands sent to the devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingCommand:
+    values: dict[str, Any]
+    future: asyncio.Future
+    timer: asyncio.TimerHandle | None = None
+
+
+class CommandDebouncer:
+    """Collapse the commands sent to the same endpoint within a window.
+
+    The values are merged field by field, the latest value of each field is
+    sent when the window expires; every caller waits for that send and gets
+    its result.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        window: float,
+        send: Callable[[Hashable, dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        self._hass = hass
+        self.window = window
+        self._send = send
+        self._pending: dict[Hashable, _PendingCommand] = {}
+        self.requests = 0
+        self.sent = 0
+
+    @property
+    def collapsed(self) -> int:
+        """Number of commands replaced by a later value before being sent."""
+        pending = len(self._pending)
+        return self.requests - self.sent - pending
+
+    async def async_send(self, key: Hashable, values: dict[str, Any]) -> None:
+        """Queue values for key and wait until the latest ones are sent."""
+        self.requests += 1
+        if self.window <= 0:
+            self.sent += 1
+            await self._send(key, values)
+            return
+        pending = self._pending.get(key)
+        if pending is None:
+            future = self._hass.loop.create_future()
+            # avoid 'exception was never retrieved' when all callers are gone
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            pending = _PendingCommand(dict(values), future)
+            pending.timer = self._hass.loop.call_later(
+                self.window, self._async_flush, key
+            )
+            self._pending[key] = pending
+        else:
+            _LOGGER.debug("Merging pending command %s: %s", key, values)
+            # a later call for the same endpoint may set fewer fields, e.g. the
+            # fan speed slider after the fan turned on with power and speed
+            pending.values.update(values)
+        await asyncio.shield(pending.future)
+
+    @callback
+    def _async_flush(self, key: Hashable) -> None:
+        self._hass.async_create_task(self._async_send_pending(key))
+
+    async def _async_send_pending(self, key: Hashable) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        self.sent += 1
+        try:
+            await self._send(key, pending.values)
+        except Exception as err:  # noqa: BLE001
+            pending.future.set_exception(err)
+        else:
+            pending.future.set_result(None)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the pending commands, used on unload."""
+        for pending in self._pending.values():
+            if pending.timer:
+                pending.timer.cancel()
+            pending.future.cancel()
+        self._pending.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "requests": self.requests,
+            "sent": self.sent,
+            "collapsed": self.collapsed,
+        }
@@ -0,0 +1,97 @@
+"""Plan the minimal list of device calls to reach a target state."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, NamedTuple
+
+
+class DeviceCommand(NamedTuple):
+    """A call to a device endpoint and the raw data fields it sets."""
+
+    path: str
+    data: dict[str, Any] | None
+    expected: dict[str, Any]
+
+
+MODE_PATHS = {
+    "cycle": "/cycle",
+    "supply": "/intake",
+    "extract": "/exhaust",
+}
+
+# Value stored in the raw data for each mode, as the status page reports it
+MODE_VALUES = {
+    "cycle": "cycle",
+    "supply": "intake",
+    "extract": "exhaust",
+}
+
+
+def plan_commands(
+    state: Mapping[str, Any],
+    target: Mapping[str, Any],
+    boost_disabled_level: int,
+    restart_on_boost_change: bool = False,
+) -> list[DeviceCommand]:
+    """Return the ordered commands that turn state into target.
+
+    Both are raw data mappings: power, operation_mode (a FanMode name),
+    fan_speed, humidity_boost_level_raw and buzzer. Fields missing from target
+    or already at the target value produce no command, any humidity level from
+    boost_disabled_level up means the boost is disabled.
+    restart_on_boost_change adds the /off + /on sequence needed by firmwares
+    that keep the boost running when the humidity set point is raised.
+    """
+    commands: list[DeviceCommand] = []
+    power = state.get("power")
+
+    if "power" in target and target["power"] != power:
+        power = target["power"]
+        commands.append(
+            DeviceCommand("/on" if power else "/off", None, {"power": power})
+        )
+
+    mode = target.get("operation_mode")
+    current_mode = str(state.get("operation_mode", "")).strip().lower()
+    if mode and current_mode not in (mode, MODE_VALUES[mode]):
+        commands.append(
+            DeviceCommand(MODE_PATHS[mode], None, {"operation_mode": MODE_VALUES[mode]})
+        )
+
+    fan_speed = target.get("fan_speed")
+    if fan_speed and fan_speed != state.get("fan_speed"):
+        commands.append(
+            DeviceCommand("/fan", {"speed": fan_speed}, {"fan_speed": fan_speed})
+        )
+
+    level = target.get("humidity_boost_level_raw")
+    current_level = state.get("humidity_boost_level_raw")
+    if level is not None and not (
+        level == current_level
+        or (
+            level >= boost_disabled_level
+            and (current_level or 0) >= boost_disabled_level
+        )
+    ):
+        commands.append(
+            DeviceCommand(
+                "/humid", {"level": level}, {"humidity_boost_level_raw": level}
+            )
+        )
+        if (
+            restart_on_boost_change
+            and state.get("humidity_boost_running")
+            and power
+            and level > state.get("humidity", 0)
+        ):
+            commands.append(DeviceCommand("/off", None, {}))
+            commands.append(DeviceCommand("/on", None, {"power": True}))
+
+    buzzer = target.get("buzzer")
+    if buzzer is not None and buzzer != state.get("buzzer"):
+        commands.append(
+            DeviceCommand("/buzzer", {"state": 1 if buzzer else 0}, {"buzzer": buzzer})
+        )
+
+    return commands
@@ -2,19 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
 from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_HOST
+from homeassistant.core import callback
 
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 
 from .bsk_api import BSKZephyrLanClient, InvalidAuthError
+from .discovery import DiscoveredDevice, async_scan
+from .probe_cache import async_store_probe
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMMAND_DEBOUNCE,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_STALE_TTL,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    CONF_DEVICES,
+    DOMAIN,
+    STALE_TTL_MARGIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,37 +47,167 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
+def split_hosts(value: str) -> list[str]:
+    """Hosts of the field, separated by commas or spaces."""
+    hosts = []
+    for host in re.split(r"[,;\s]+", value):
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
+
 class SetupBSKZephyrLanConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for BSK Zephyr."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return BSKZephyrLanOptionsFlow()
+
+    def __init__(self) -> None:
+        self._discovered: dict[str, DiscoveredDevice] = {}
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["discovery", "manual"])
+
+    async def async_step_discovery(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Scan the local networks and let the user pick the devices."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            devices = {}
+            for device_id in user_input[CONF_DEVICES]:
+                device = self._discovered[device_id]
+                # setup starts from this read instead of fetching again
+                async_store_probe(self.hass, device.host, device.raw_data)
+                devices[device_id] = device.host
+            if devices:
+                return await self._async_create_devices_entry(devices)
+            errors["base"] = "no_devices_selected"
+        else:
+            configured = self._async_configured_device_ids()
+            self._discovered = {
+                device.device_id: device
+                for device in await async_scan(self.hass)
+                if device.device_id not in configured
+            }
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
 
-            try:
-                client = BSKZephyrLanClient(
-                    async_get_clientsession(self.hass),
-                    user_input[CONF_HOST],
-                )
-                await client.login()
-            except InvalidAuthError as e:
-                errors["base"] = str(e)
-            except Exception as e:
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = str(e)
-            else:                
-                await self.async_set_unique_id(client._raw_data["device_id"])
-                self._abort_if_unique_id_configured()
-                
-                return self.async_create_entry(
-                    title=user_input[CONF_HOST] + " " + client._raw_data["device_id"], data=user_input
+        options = {
+            device_id: f"{device.model} {device_id} ({device.host})"
+            for device_id, device in self._discovered.items()
+        }
+        schema = vol.Schema(
+            {vol.Required(CONF_DEVICES, default=list(options)): cv.multi_select(options)}
+        )
+        return self.async_show_form(step_id="discovery", data_schema=schema, errors=errors)
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Add the devices at the addresses entered by the user."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            hosts = split_hosts(user_input[CONF_HOST])
+            session = async_get_clientsession(self.hass)
+            clients = [BSKZephyrLanClient(session, host) for host in hosts]
+            # all the devices are probed together
+            results = await asyncio.gather(
+                *(client.login() for client in clients), return_exceptions=True
+            )
+            for host, result in zip(hosts, results):
+                if isinstance(result, InvalidAuthError):
+                    errors["base"] = str(result)
+                elif isinstance(result, Exception):
+                    _LOGGER.error("Unexpected exception probing %s: %s", host, result)
+                    errors["base"] = f"{host}: {result}"
+            if not hosts:
+                errors["base"] = "cannot_connect"
+            if not errors:
+                for client in clients:
+                    # setup starts from this read instead of fetching again
+                    async_store_probe(
+                        self.hass, client.host, client.snapshot(), client.status_transport
+                    )
+                return await self._async_create_devices_entry(
+                    {client.device_id: client.host for client in clients}
                 )
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="manual", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    def _async_configured_device_ids(self) -> set[str]:
+        device_ids = set()
+        for entry in self._async_current_entries(include_ignore=False):
+            device_ids.update(entry.data.get(CONF_DEVICES) or {entry.unique_id: None})
+        return device_ids
+
+    async def _async_create_devices_entry(
+        self, devices: dict[str, str]
+    ) -> ConfigFlowResult:
+        """Create the entry of devices (device_id -> host), the first one names it."""
+        device_id, host = next(iter(devices.items()))
+        await self.async_set_unique_id(device_id)
+        self._abort_if_unique_id_configured()
+        if not self._async_configured_device_ids().isdisjoint(devices):
+            return self.async_abort(reason="already_configured")
+
+        return self.async_create_entry(
+            title=" ".join(devices.values()) + " " + device_id,
+            data={CONF_HOST: host, CONF_DEVICES: devices},
+        )
+
+
+class BSKZephyrLanOptionsFlow(OptionsFlow):
+    """Handle the polling and command options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            min_stale_ttl = 2 * user_input[CONF_MAX_POLL_INTERVAL] + STALE_TTL_MARGIN
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors["base"] = "invalid_poll_interval"
+            elif 0 < user_input[CONF_STALE_TTL] < min_stale_ttl:
+                # a single dropped poll would make the entities unavailable
+                errors[CONF_STALE_TTL] = "stale_ttl_too_short"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_POLL_INTERVAL,
+                    default=options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=2, max=3600)),
+                vol.Required(
+                    CONF_MAX_POLL_INTERVAL,
+                    default=options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=2, max=3600)),
+                vol.Required(
+                    CONF_COMMAND_DEBOUNCE,
+                    default=options.get(CONF_COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Required(
+                    CONF_STALE_TTL,
+                    default=options.get(
+                        CONF_STALE_TTL,
+                        2 * options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+                        + STALE_TTL_MARGIN,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            }
         )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
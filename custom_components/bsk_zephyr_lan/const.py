@@ -3,3 +3,23 @@
 DOMAIN = "bsk_zephyr_lan"
 
 SUPPORTED_MODELS = ["BSK-Zephyr-V2.0", "BSK-Zephyr-Mini-V1.0"]
+
+# Seconds a slider value waits for a newer one before being sent
+CONF_COMMAND_DEBOUNCE = "command_debounce"
+DEFAULT_COMMAND_DEBOUNCE = 0.5
+
+# Bounds of the adaptive polling interval, in seconds
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+DEFAULT_MIN_POLL_INTERVAL = 10
+DEFAULT_MAX_POLL_INTERVAL = 60
+
+# Seconds the last good data stays available while a device does not answer.
+# It must cover two of the slowest polls plus the timeouts of the failed one,
+# or one dropped poll makes the entities unavailable until the next one.
+CONF_STALE_TTL = "stale_ttl"
+STALE_TTL_MARGIN = 15
+DEFAULT_STALE_TTL = 2 * DEFAULT_MAX_POLL_INTERVAL + STALE_TTL_MARGIN
+
+# Devices of a config entry, device_id -> host
+CONF_DEVICES = "devices"
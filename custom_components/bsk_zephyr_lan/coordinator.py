@@ -2,74 +2,549 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 from datetime import timedelta
 import logging
+import time
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers import storage
+from homeassistant.helpers import device_registry as dr, storage
 import copy
 
-from .bsk_api import BSKZephyrLanClient, ZephyrDevice, ZephyrException
+from .bsk_api import (
+    BSKZephyrLanClient,
+    CannotConnectError,
+    DeviceUnavailableError,
+    ZephyrDevice,
+    ZephyrException,
+    device_changed_fields,
+    fan_speed_value_to_enum,
+)
+from .command_debouncer import CommandDebouncer
+from .discovery import async_scan
+from .fleet import async_get_fleet_scheduler
 
-from .const import DOMAIN, SUPPORTED_MODELS
+from .const import (
+    CONF_COMMAND_DEBOUNCE,
+    CONF_DEVICES,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_STALE_TTL,
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DOMAIN,
+    STALE_TTL_MARGIN,
+    SUPPORTED_MODELS,
+)
+from .polling import AdaptivePollInterval
+from .probe_cache import async_pop_probe
 
 _LOGGER = logging.getLogger(__name__)
 
+# Refresh requests received within this window are merged into one fetch
+REFRESH_COALESCE_WINDOW = 1.0
+# Devices of the same entry fetched at the same time
+MAX_PARALLEL_FETCHES = 4
+# Seconds a new device snapshot waits before being written to the store
+SNAPSHOT_SAVE_DELAY = 300
+# Store key of the last good raw data of the device
+STORE_SNAPSHOT = "snapshot"
+# Consecutive connection failures before looking for the device at another address
+REHOME_AFTER_FAILURES = 3
+# Seconds between two searches of the same device
+REHOME_INTERVAL = 600
+
+
+class RefreshCoalescer:
+    """Merge the refresh requests received in a short window into one fetch."""
+
+    def __init__(self, hass: HomeAssistant, window: float, refresh) -> None:
+        self._refresh = refresh
+        self._debouncer = Debouncer(
+            hass, _LOGGER, cooldown=window, immediate=False, function=self._async_fetch
+        )
+        # groups waiting for a refresh
+        self._pending: set[str] = set()
+        self.requests = 0
+        self.fetches = 0
+        self.satisfied_by_poll = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Number of requests that did not need a fetch of their own."""
+        return self.requests - self.fetches - (1 if self._pending else 0)
+
+    @callback
+    def async_request(self, group_id: str) -> None:
+        """Request a refresh of group_id, merged with the others in the window."""
+        self.requests += 1
+        self._pending.add(group_id)
+        self._debouncer.async_schedule_call()
+
+    @callback
+    def async_poll_started(self) -> None:
+        """A full poll is starting, it also answers the pending requests."""
+        if self._pending:
+            self._pending.clear()
+            self.satisfied_by_poll += 1
+            self._debouncer.async_cancel()
+
+    @callback
+    def async_cancel(self) -> None:
+        self._pending.clear()
+        self._debouncer.async_cancel()
+
+    async def _async_fetch(self) -> None:
+        if not self._pending:
+            return
+        groups, self._pending = self._pending, set()
+        self.fetches += 1
+        await self._refresh(groups)
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "satisfied_by_poll": self.satisfied_by_poll,
+        }
+
 
 class BSKDataUpdateCoordinator(DataUpdateCoordinator):
-    """BSK Zephyr Data Update Coordinator."""
+    """BSK Zephyr Data Update Coordinator, polling all the devices of an entry."""
 
     def __init__(
         self,
         hass: HomeAssistant,
         config_entry: ConfigEntry,
-        client: BSKZephyrLanClient,
+        clients: dict[str, BSKZephyrLanClient],
     ) -> None:
-        """Initialize data coordinator."""
+        """Initialize data coordinator, clients are keyed by device_id."""
         self.hass = hass
         self.entry = config_entry
+        # the entry is reloaded only when it differs from these
         self.config = (self.entry.data or {}).copy()
+        self.options = dict(self.entry.options)
+        self.poll_interval = AdaptivePollInterval(
+            config_entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+            config_entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+        )
+        # every update reaches async_update_listeners, which runs only the
+        # entities whose fields or availability changed
         super().__init__(
             hass,
             _LOGGER,
             config_entry=config_entry,
             name=f"{DOMAIN}_{config_entry.data[CONF_HOST]}",
-            update_interval=timedelta(seconds=10),
+            update_interval=timedelta(seconds=self.poll_interval.interval),
         )
         self.data = {}
-        self.api = client
-        self.store = storage.Store(hass, version=1, key=f"{DOMAIN}.{client._raw_data["device_id"]}")
-        self.store_last_saved = None
-        self._async_request_refresh_from_callback = False
+        self.clients = clients
+        for client in clients.values():
+            # the polls keep the cache this fresh while the device is used
+            client.state_max_age = self.poll_interval.min_interval
+        self.stores = {
+            device_id: storage.Store(hass, version=1, key=f"{DOMAIN}.{device_id}")
+            for device_id in clients
+        }
+        self.stores_last_saved: dict[str, dict] = {}
+        self._snapshot_save_pending: set[str] = set()
+        self._group_clients: dict[str, BSKZephyrLanClient] = {}
+        self._device_groups: dict[str, str] = {}
+        # device_id -> error of the devices that failed the last poll
+        self.failed_devices: dict[str, str] = {}
+        # the last good data is served for this long while the device fails
+        self.stale_ttl = config_entry.options.get(
+            CONF_STALE_TTL, 2 * self.poll_interval.max_interval + STALE_TTL_MARGIN
+        )
+        self._last_fetch: dict[str, float] = {}
+        self._connection_failures: dict[str, int] = {}
+        self._last_rehome: dict[str, float] = {}
+        self._unsub_stale_check = None
+        self._fetch_semaphore = asyncio.Semaphore(MAX_PARALLEL_FETCHES)
+        self.refresh_coalescer = RefreshCoalescer(
+            hass, REFRESH_COALESCE_WINDOW, self._async_refresh_now
+        )
+        self.fleet = async_get_fleet_scheduler(hass)
+        self.fleet.async_register(config_entry.entry_id)
+        # groups of a targeted refresh, fetched outside the fleet fetch slots
+        self._refresh_only: set[str] | None = None
+        self.command_debouncer = CommandDebouncer(
+            hass,
+            config_entry.options.get(CONF_COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE),
+            self._async_send_debounced,
+        )
+        self._notified_data: dict[str, ZephyrDevice] = {}
+        self._notified_stale: set[str] = set()
+
+    def client_for(self, group_id: str) -> BSKZephyrLanClient:
+        """Return the client of the device publishing group_id."""
+        return self._group_clients[group_id]
+
+    @property
+    def failed_groups(self) -> set[str]:
+        return {
+            self._device_groups[device_id]
+            for device_id in self.failed_devices
+            if device_id in self._device_groups
+        }
+
+    def data_age(self, group_id: str) -> float | None:
+        """Seconds since the data of group_id was last read from the device."""
+        last_fetch = self._last_fetch.get(group_id)
+        if last_fetch is None:
+            return None
+        return time.monotonic() - last_fetch
+
+    def is_stale(self, group_id: str) -> bool:
+        """Return True if the device is failing for longer than the staleness TTL."""
+        if group_id not in self.failed_groups and self.last_update_success:
+            return False
+        age = self.data_age(group_id)
+        return age is None or age > self.stale_ttl
+
+    @callback
+    def _async_schedule_stale_check(self) -> None:
+        """Notify the entities when the data of a failing device expires."""
+        if self._unsub_stale_check:
+            self._unsub_stale_check()
+            self._unsub_stale_check = None
+        remaining = [
+            self.stale_ttl - age
+            for group_id in self.failed_groups
+            if (age := self.data_age(group_id)) is not None and age <= self.stale_ttl
+        ]
+        if remaining:
+            self._unsub_stale_check = async_call_later(
+                self.hass, max(min(remaining), 0) + 1, self._async_stale_check
+            )
+
+    @callback
+    def _async_stale_check(self, _now) -> None:
+        self._unsub_stale_check = None
+        self.async_update_listeners()
+        self._async_schedule_stale_check()
 
     async def _async_update_data(self) -> dict[str:ZephyrDevice]:
         """Request to the server to update the status from full response data."""
-        from_cache = self._async_request_refresh_from_callback
-        if from_cache:
-            _LOGGER.debug("_async_update_data. _from_cache %s", from_cache)
-        self._async_request_refresh_from_callback = False
-        if not self.store_last_saved:
-            self.api.persistent_data = await self.store.async_load() or {}
-            self.store_last_saved = copy.deepcopy(self.api.persistent_data)
+        device_ids = list(self.clients)
+        scheduled = self._refresh_only is None
+        if not scheduled:
+            groups, self._refresh_only = self._refresh_only, None
+            device_ids = [
+                device_id
+                for device_id in device_ids
+                if self._device_groups.get(device_id) in groups
+            ]
+        else:
+            self.refresh_coalescer.async_poll_started()
+        results = await asyncio.gather(
+            *(self._async_fetch_device(device_id, scheduled) for device_id in device_ids),
+            return_exceptions=True,
+        )
+        data = dict(self.data or {})
+        errors = []
+        for device_id, result in zip(device_ids, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                _LOGGER.debug("Error updating device %s: %s", device_id, result)
+                self.failed_devices[device_id] = str(result)
+                errors.append(result)
+                # with the circuit breaker open the device is not contacted,
+                # only the requests that went out count as failures
+                if isinstance(result, CannotConnectError) and not isinstance(
+                    result, DeviceUnavailableError
+                ):
+                    self._async_connection_failed(device_id)
+                continue
+            self.failed_devices.pop(device_id, None)
+            self._connection_failures.pop(device_id, None)
+            data.update(result)
+
+        self._async_schedule_stale_check()
+        if errors and len(self.failed_devices) == len(self.clients):
+            self._set_next_poll(self.poll_interval.failed())
+            raise UpdateFailed(errors[0]) from errors[0]
+        if self.data and not set(data).issubset(self.data):
+            # a device that was offline at setup came online, create its entities
+            _LOGGER.info("New device found, reloading %s", self.entry.title)
+            self.hass.config_entries.async_schedule_reload(self.entry.entry_id)
+        if errors:
+            # a device failed, retry it before its last data goes stale
+            self._set_next_poll(self.poll_interval.failed())
+        else:
+            self._set_next_poll(
+                self.poll_interval.update(
+                    (group_id, device)
+                    for group_id, device in data.items()
+                    if group_id not in self.failed_groups
+                )
+            )
+        return data
+
+    @callback
+    def _set_next_poll(self, interval: float) -> None:
+        """Schedule the next poll after interval, moved to the fleet slot of the entry."""
+        self.update_interval = timedelta(
+            seconds=self.fleet.next_poll_delay(self.entry.entry_id, interval)
+        )
+
+    @callback
+    def _async_connection_failed(self, device_id: str) -> None:
+        """Look for the device elsewhere when its address stops answering."""
+        failures = self._connection_failures.get(device_id, 0) + 1
+        self._connection_failures[device_id] = failures
+        last_rehome = self._last_rehome.get(device_id)
+        if failures < REHOME_AFTER_FAILURES or (
+            last_rehome is not None and time.monotonic() - last_rehome < REHOME_INTERVAL
+        ):
+            return
+        self._last_rehome[device_id] = time.monotonic()
+        self.entry.async_create_background_task(
+            self.hass, self._async_rehome(device_id), f"{self.name} rehome {device_id}"
+        )
+
+    async def _async_rehome(self, device_id: str) -> None:
+        """Search the device on the local networks and follow its new address."""
+        client = self.clients[device_id]
+        _LOGGER.debug("Searching %s, not answering at %s", device_id, client.host)
+        found = [
+            device
+            for device in await async_scan(self.hass, device_id=device_id)
+            if device.device_id == device_id
+        ]
+        if not found or found[0].host == client.host:
+            return
+        old_host, host = client.host, found[0].host
+        _LOGGER.info("Device %s moved from %s to %s", device_id, old_host, host)
+        await client.async_set_host(host)
+
+        devices = dict(self.entry.data.get(CONF_DEVICES) or {device_id: old_host})
+        devices[device_id] = host
+        data = {**self.entry.data, CONF_DEVICES: devices}
+        if data[CONF_HOST] == old_host:
+            data[CONF_HOST] = host
+        # the generated title lists the hosts, follow the host wherever it is listed
+        title = " ".join(
+            host if word == old_host else word for word in self.entry.title.split(" ")
+        )
+        # updated in place, the update listener must not reload the entry
+        self.config = data
+        self.hass.config_entries.async_update_entry(self.entry, title=title, data=data)
+        device_registry = dr.async_get(self.hass)
+        if device := device_registry.async_get_device(identifiers={(DOMAIN, device_id)}):
+            device_registry.async_update_device(
+                device.id, configuration_url=f"http://{host}"
+            )
+
+        self._connection_failures.pop(device_id, None)
+        if group_id := self._device_groups.get(device_id):
+            await self._async_refresh_now({group_id})
+
+    async def async_initial_data(self) -> None:
+        """Create the data from the stored snapshots, fetch the devices without one.
+
+        The devices restored from a snapshot are fetched in the background,
+        setup does not wait for them. A device just probed by the config
+        flow is used as is.
+        """
+        data = {}
+        loaded = set()
+        restored = set()
+        for device_id, client in self.clients.items():
+            snapshot = await self._async_load_store(device_id)
+            probe = async_pop_probe(self.hass, device_id)
+            if probe is not None and probe.host == client.host:
+                snapshot = probe.raw_data
+                if probe.transport:
+                    # the probe already detected it, skip the detection
+                    client.persistent_data[client.STATUS_TRANSPORT_KEY] = probe.transport
+            else:
+                probe = None
+            if not snapshot:
+                continue
+            try:
+                devices = await client.restore_snapshot(snapshot)
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Ignoring the snapshot of %s: %s", device_id, err)
+                continue
+            loaded.add(device_id)
+            if probe is None:
+                restored.add(device_id)
+            else:
+                for group_id in devices:
+                    self._last_fetch[group_id] = probe.probed_at
+            self._register_groups(device_id, client, devices)
+            data.update(devices)
+
+        missing = [device_id for device_id in self.clients if device_id not in loaded]
+        results = await asyncio.gather(
+            *(self._async_fetch_device(device_id) for device_id in missing),
+            return_exceptions=True,
+        )
+        errors = []
+        for device_id, result in zip(missing, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Device %s not reachable: %s", device_id, result)
+                self.failed_devices[device_id] = str(result)
+                errors.append(result)
+            else:
+                data.update(result)
+        if not data:
+            if errors:
+                raise errors[0]
+            raise UpdateFailed(f"No devices configured in {self.entry.title}")
+
+        self.async_set_updated_data(data)
+        if restored:
+            self._refresh_only = {self._device_groups[device_id] for device_id in restored}
+            self.entry.async_create_background_task(
+                self.hass, self.async_refresh(), f"{self.name} live refresh"
+            )
+
+    async def _async_load_store(self, device_id: str) -> dict | None:
+        """Load the persistent data of the device, return its snapshot."""
+        stored = await self.stores[device_id].async_load() or {}
+        snapshot = stored.pop(STORE_SNAPSHOT, None)
+        self.clients[device_id].persistent_data = stored
+        self.stores_last_saved[device_id] = copy.deepcopy(stored)
+        return snapshot
+
+    def _store_data(self, device_id: str) -> dict:
+        self._snapshot_save_pending.discard(device_id)
+        client = self.clients[device_id]
+        return {**client.persistent_data, STORE_SNAPSHOT: client.snapshot()}
+
+    async def _async_fetch_device(
+        self, device_id: str, scheduled: bool = True
+    ) -> dict[str, ZephyrDevice]:
+        client = self.clients[device_id]
+        store = self.stores[device_id]
+        if device_id not in self.stores_last_saved:
+            await self._async_load_store(device_id)
+        fleet_slot = self.fleet.fetch_slot() if scheduled else contextlib.nullcontext()
+        async with self._fetch_semaphore, fleet_slot:
+            devices = await client.list_devices()
+        if client.persistent_data != self.stores_last_saved[device_id]:
+            await store.async_save(self._store_data(device_id))
+            self.stores_last_saved[device_id] = copy.deepcopy(client.persistent_data)
+        elif device_id not in self._snapshot_save_pending:
+            # readings change at every poll, the snapshot is written lazily
+            self._snapshot_save_pending.add(device_id)
+            store.async_delay_save(
+                lambda: self._store_data(device_id), SNAPSHOT_SAVE_DELAY
+            )
+        now = time.monotonic()
+        for group_id in devices:
+            self._last_fetch[group_id] = now
+        self._register_groups(device_id, client, devices)
+        return devices
+
+    def _register_groups(
+        self, device_id: str, client: BSKZephyrLanClient, devices: dict[str, ZephyrDevice]
+    ) -> None:
+        for group_id in devices:
+            self._group_clients[group_id] = client
+            self._device_groups[device_id] = group_id
+
+    async def _async_refresh_now(self, groups: set[str]) -> None:
+        """Refresh the devices of groups outside the fleet fetch slots."""
+        self._refresh_only = groups
+        await self.async_refresh()
+
+    async def async_status_refresh(self, group_id: str) -> None:
+        """Push the state known after a command and schedule a verification fetch."""
+        _LOGGER.debug("async_status_refresh %s", group_id)
+        client = self.client_for(group_id)
+        devices = await client.list_devices(True)
+        self._set_next_poll(self.poll_interval.command_sent())
+        # listeners only run for the changed fields, this also moves the
+        # next poll on the fast interval
+        self.async_set_updated_data({**self.data, **devices})
+        if not client.refresh_required:
+            # the command responses already reported the new state
+            return
+        self.refresh_coalescer.async_request(group_id)
+
+    async def async_control_debounced(self, group_id: str, endpoint: str, **values) -> None:
+        """Send a setting through the debouncer, showing the target meanwhile."""
+        overlay = dict(values)
+        if "fan_speed" in overlay:
+            overlay["fan_speed_enum"] = fan_speed_value_to_enum(int(overlay["fan_speed"]))
+        device = self.data[group_id].model_copy(update=overlay)
+        self.async_set_updated_data({**self.data, group_id: device})
+        await self.command_debouncer.async_send((group_id, endpoint), values)
+
+    async def _async_send_debounced(self, key: tuple[str, str], values: dict) -> None:
+        group_id, _ = key
+        client = self.client_for(group_id)
         try:
-            supported_devices = await self.api.list_devices(from_cache)
-            if self.api.persistent_data != self.store_last_saved:
-                await self.store.async_save(self.api.persistent_data)
-                self.store_last_saved = copy.deepcopy(self.api.persistent_data)
-            if from_cache: #create a new request if the data is received from a callback async_status_refresh
-                await self.async_request_refresh()
-            return supported_devices
-        except ZephyrException as e:
-            raise UpdateFailed(e) from e
-
-    async def async_status_refresh(self) -> None:
-        """Refresh current status."""
-        _LOGGER.debug("async_status_refresh")
-        supported_devices = await self.api.list_devices(True)
-        self.async_set_updated_data(supported_devices)
-        self._async_request_refresh_from_callback = True
-        await self.async_request_refresh()
+            await client.control_device(group_id, **values)
+        except Exception:
+            # drop the optimistic target
+            self.async_set_updated_data({**self.data, **await client.list_devices(True)})
+            raise
+        await self.async_status_refresh(group_id)
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending refresh or command."""
+        self.refresh_coalescer.async_cancel()
+        self.command_debouncer.async_cancel()
+        if self._unsub_stale_check:
+            self._unsub_stale_check()
+            self._unsub_stale_check = None
+        self.fleet.async_unregister(self.entry.entry_id)
+        await super().async_shutdown()
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners subscribed to the fields that changed.
+
+        Entities register with a (group_id, keys) context, listeners without a
+        context and availability changes still notify everyone.
+        """
+        changed = self._async_changed_fields()
+        if changed is None:
+            super().async_update_listeners()
+            return
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                update_callback()
+                continue
+            group_id, keys = context
+            changed_keys = changed.get(group_id, ())
+            if changed_keys is None or not keys.isdisjoint(changed_keys):
+                update_callback()
+
+    def _async_changed_fields(self) -> dict[str, set[str] | None] | None:
+        """Return the changed fields per group.
 
+        A group maps to None when its availability changed, the whole result
+        is None when all listeners must run. Failed polls do not change the
+        availability until the data is older than the staleness TTL.
+        """
+        previous, self._notified_data = self._notified_data, self.data or {}
+        previous_stale, self._notified_stale = self._notified_stale, {
+            group_id for group_id in self._notified_data if self.is_stale(group_id)
+        }
+        if not previous:
+            return None
+        changed = {}
+        for group_id, device in self._notified_data.items():
+            old = previous.get(group_id)
+            if old is None:
+                return None
+            if (group_id in previous_stale) != (group_id in self._notified_stale):
+                changed[group_id] = None
+            else:
+                changed[group_id] = device_changed_fields(old, device)
+        return changed
@@ -0,0 +1,36 @@
+"""HTTP sessions of the device clients, resolving and identifying as Home Assistant."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp_asyncmdnsresolver.api import AsyncMDNSResolver
+
+from homeassistant.components import zeroconf
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+
+from .bsk_api import SessionFactory
+
+
+@callback
+def async_device_session_factory(hass: HomeAssistant) -> SessionFactory:
+    """Return the factory of the per-device pools of the clients.
+
+    async_create_clientsession shares the Home Assistant connector, whose pool
+    cannot be tuned per device: the pool keeps the client tuning and gets the
+    mDNS resolver (*.local host names) and the user agent of the HA sessions.
+    """
+
+    def create(connector_options: dict[str, Any], **options: Any) -> ClientSession:
+        # owned by the connector, closed with the session
+        resolver = AsyncMDNSResolver(async_zeroconf=zeroconf.async_get_async_zeroconf(hass))
+        return ClientSession(
+            connector=TCPConnector(resolver=resolver, **connector_options),
+            headers={USER_AGENT: SERVER_SOFTWARE},
+            **options,
+        )
+
+    return create
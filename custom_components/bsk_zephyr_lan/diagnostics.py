@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 from typing import Any
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
@@ -10,11 +11,25 @@ async def async_get_config_entry_diagnostics(
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     coordinator = entry.runtime_data.coordinator
-    api = coordinator.api
 
     return serialize({
         "coordinator_data": coordinator.data,
-        "raw_data": api._raw_data
+        "devices": {
+            device_id: {
+                "host": api.host,
+                "raw_data": api._raw_data,
+                "connections": api.connection_stats,
+                "circuit": api.circuit_breaker.as_dict(),
+                "metrics": api.metrics.as_dict(),
+                "status_transport": api.status_transport,
+                "capabilities": api.capabilities and dataclasses.asdict(api.capabilities),
+                "last_error": coordinator.failed_devices.get(device_id),
+            }
+            for device_id, api in coordinator.clients.items()
+        },
+        "refresh": coordinator.refresh_coalescer.as_dict(),
+        "commands": coordinator.command_debouncer.as_dict(),
+        "fleet": coordinator.fleet.as_dict(),
     })
 
 
@@ -0,0 +1,132 @@
+"""Concurrent scan of the local networks for BSK Zephyr status pages."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from typing import Any, NamedTuple
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .status_parser import StatusPageParser
+
+_LOGGER = logging.getLogger(__name__)
+
+# Probes in flight at the same time
+MAX_CONCURRENT_PROBES = 64
+# Seconds an address has to answer, Zephyr units answer well within it
+PROBE_TIMEOUT = 1.5
+# Bytes read from each page, the status page is much smaller
+MAX_PAGE_SIZE = 64 * 1024
+# Networks larger than this are scanned only in the /24 around the address
+MIN_SCAN_PREFIX = 22
+
+_PARSER = StatusPageParser()
+
+
+class DiscoveredDevice(NamedTuple):
+    host: str
+    device_id: str
+    model: str
+    version: str
+    raw_data: dict[str, Any]
+
+
+async def async_get_scan_networks(
+    hass: HomeAssistant,
+) -> list[ipaddress.IPv4Network]:
+    """Return the IPv4 networks of the enabled adapters."""
+    networks = []
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            address = ipaddress.IPv4Address(ipv4["address"])
+            if address.is_loopback or address.is_link_local:
+                continue
+            prefix = ipv4["network_prefix"]
+            if prefix < MIN_SCAN_PREFIX:
+                prefix = 24
+            subnet = ipaddress.IPv4Network(f"{address}/{prefix}", strict=False)
+            if subnet not in networks:
+                networks.append(subnet)
+    return networks
+
+
+async def async_probe(
+    session: ClientSession, host: str, timeout: float = PROBE_TIMEOUT
+) -> DiscoveredDevice | None:
+    """Return the device at host, None if it is not a Zephyr status page."""
+    try:
+        async with session.get(
+            f"http://{host}/",
+            timeout=ClientTimeout(total=timeout),
+            allow_redirects=False,
+        ) as r:
+            if r.status != 200:
+                return None
+            html = (await r.content.read(MAX_PAGE_SIZE)).decode(errors="ignore")
+    except (ClientError, TimeoutError, ValueError):
+        return None
+    if "<p><b>" not in html:
+        return None
+    data = _PARSER.parse(html)
+    if not _PARSER.is_valid(data) or "device_id" not in data:
+        return None
+    return DiscoveredDevice(
+        host,
+        data["device_id"],
+        data.get("device_model", ""),
+        data.get("device_version", ""),
+        data,
+    )
+
+
+async def async_scan(
+    hass: HomeAssistant,
+    networks: list[ipaddress.IPv4Network] | None = None,
+    device_id: str | None = None,
+    concurrency: int = MAX_CONCURRENT_PROBES,
+    timeout: float = PROBE_TIMEOUT,
+) -> list[DiscoveredDevice]:
+    """Probe every address of networks, at most concurrency at a time.
+
+    With device_id the scan stops as soon as that device is found.
+    """
+    if networks is None:
+        networks = await async_get_scan_networks(hass)
+    session = async_get_clientsession(hass)
+    hosts = iter({str(host): None for subnet in networks for host in subnet.hosts()})
+    found: list[DiscoveredDevice] = []
+
+    async def worker() -> None:
+        # the workers share the iterator, each address is probed once
+        for host in hosts:
+            device = await async_probe(session, host, timeout)
+            if device is None:
+                continue
+            found.append(device)
+            if device.device_id == device_id:
+                return
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        if device_id is None:
+            await asyncio.gather(*workers)
+        else:
+            pending = set(workers)
+            while pending and not any(d.device_id == device_id for d in found):
+                _, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    _LOGGER.debug("Scan of %s found %s", networks, [d.host for d in found])
+    return sorted(found, key=lambda d: ipaddress.IPv4Address(d.host))
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 from typing import Optional, Any, Callable
 
 from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -12,6 +15,7 @@ from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, Device
 from homeassistant.util import slugify
 
 from . import BSKZephyrConfigEntry, BSKDataUpdateCoordinator
+from .bsk_api import DeviceUnavailableError
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -21,6 +25,8 @@ class BSKZephyrEntity(CoordinatorEntity):
     _attr_has_entity_name = True
     coordinator: BSKDataUpdateCoordinator | None = None
     device = None
+    # Device fields read by the entity, defaults to the entity_description key
+    _attr_subscribed_keys: tuple[str, ...] | None = None
 
     def __init__(
         self,
@@ -28,7 +34,8 @@ class BSKZephyrEntity(CoordinatorEntity):
         coordinator: BSKDataUpdateCoordinator,
         entity_description: EntityDescription,
     ):
-        super().__init__(coordinator)
+        keys = self._attr_subscribed_keys or (entity_description.key,)
+        super().__init__(coordinator, context=(groupID, frozenset(keys)))
         self.device = coordinator.data[groupID]
         self.coordinator = coordinator
         self.groupID = groupID
@@ -52,6 +59,37 @@ class BSKZephyrEntity(CoordinatorEntity):
         self._handle_coordinator_update()
         await super().async_added_to_hass()
 
+    @property
+    def api(self):
+        """Client of the device the entity belongs to."""
+        return self.coordinator.client_for(self.groupID)
+
+    async def async_control(self, **values) -> None:
+        """Send values to the device and refresh its state."""
+        with self._command_errors():
+            await self.api.control_device(self.groupID, **values)
+            await self.coordinator.async_status_refresh(self.groupID)
+
+    async def async_control_debounced(self, endpoint: str, **values) -> None:
+        """Send values to endpoint through the debouncer of the coordinator."""
+        with self._command_errors():
+            await self.coordinator.async_control_debounced(self.groupID, endpoint, **values)
+
+    @contextmanager
+    def _command_errors(self) -> Iterator[None]:
+        """Report a command not sent to a device known to be offline to the caller."""
+        try:
+            yield
+        except DeviceUnavailableError as err:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="device_unavailable",
+                translation_placeholders={
+                    "name": f"{self.device.device_name} {self.device.device_id}",
+                    "host": self.api.host,
+                },
+            ) from err
+
     @property
     def device_info(self):
         # Reuse the same DeviceInfo already created        
@@ -74,14 +112,15 @@ class BSKZephyrEntity(CoordinatorEntity):
                 name=f"{device.device_name} {device.device_id}",
                 model=device.device_model,
                 sw_version=device.device_version,
-                configuration_url=f"http://{entry.data['host']}"
+                configuration_url=f"http://{self.api.host}"
             )
         return self._device_info
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        if not self.coordinator.last_update_success:
+        # the last good data is kept while the device is briefly unreachable
+        if self.coordinator.is_stale(self.groupID):
             return False
 
         # Check if the key exists in the data
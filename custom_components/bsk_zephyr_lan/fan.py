@@ -29,7 +29,8 @@ async def async_setup_entry(
 
 class BSKZephyrFan(BSKZephyrEntity, FanEntity):
     _attr_domain = "fan"
-    
+    _attr_subscribed_keys = ("power", "fan_speed", "fan_speed_enum", "operation_mode_enum")
+
     SPEED_RANGE = (22, 80)
 
     def __init__(
@@ -70,8 +71,7 @@ class BSKZephyrFan(BSKZephyrEntity, FanEntity):
             direction = FanMode.supply.name
         if self.direction_list is None or direction not in self.direction_list:
             raise ValueError(f"{direction} is not a valid direction_mode: {self.direction_list}")
-        await self.coordinator.api.control_device(self.groupID, operation_mode_enum=direction)
-        await self.coordinator.async_status_refresh()
+        await self.async_control(operation_mode_enum=direction)
 
 
     @property
@@ -88,8 +88,7 @@ class BSKZephyrFan(BSKZephyrEntity, FanEntity):
             return
         if self.preset_modes is None or preset_mode not in self.preset_modes:
             raise ValueError(f"{preset_mode} is not a valid preset_mode: {self.preset_modes}")
-        await self.coordinator.api.control_device(self.groupID, fan_speed_enum=preset_mode)
-        await self.coordinator.async_status_refresh()
+        await self.async_control(fan_speed_enum=preset_mode)
 
 
     @property
@@ -104,34 +103,40 @@ class BSKZephyrFan(BSKZephyrEntity, FanEntity):
 
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed of the fan, as a percentage."""
-        if percentage == self.percentage:
+        if percentage == self.percentage and self.device.power:
             return
         if percentage == 0:
             await self.async_turn_off()
             return
-        if not self.device.power:
-            await self.coordinator.api.control_device(self.groupID, power=True)
-        new_state = int(math.ceil(percentage_to_ranged_value(self.SPEED_RANGE, percentage)))
-        await self.coordinator.api.control_device(self.groupID, fan_speed=new_state)
-        await self.coordinator.async_status_refresh()
+        await self.async_control_debounced(
+            "/fan", power=True, fan_speed=self._percentage_to_speed(percentage)
+        )
 
     async def async_turn_on(self, 
         percentage: int | None = None,
         preset_mode: str | None = None,
         **kwargs) -> None:
         """Turn on the fan asynchronously."""
-        if not self.device.power:
-            await self.coordinator.api.control_device(self.groupID, power=True)
-            await self.coordinator.async_status_refresh()
-        if preset_mode:
-            await self.async_set_preset_mode(preset_mode)
-        if percentage is not None:
-            await self.async_set_percentage(percentage)
+        if percentage == 0:
+            await self.async_turn_off()
+            return
+        # a single planned call, the planner skips what is already set
+        values = {"power": True}
+        if preset_mode and (self.preset_modes is None or preset_mode not in self.preset_modes):
+            raise ValueError(f"{preset_mode} is not a valid preset_mode: {self.preset_modes}")
+        if percentage:
+            # applied after the preset, so the percentage wins
+            values["fan_speed"] = self._percentage_to_speed(percentage)
+        elif preset_mode:
+            values["fan_speed_enum"] = preset_mode
+        await self.async_control(**values)
+
+    def _percentage_to_speed(self, percentage: int) -> int:
+        return int(math.ceil(percentage_to_ranged_value(self.SPEED_RANGE, percentage)))
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the fan asynchronously."""
         if not self.device.power:
             return
-        await self.coordinator.api.control_device(self.groupID, power=False)
-        await self.coordinator.async_status_refresh()
+        await self.async_control(power=False)
         
\ No newline at end of file
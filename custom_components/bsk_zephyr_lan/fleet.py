@@ -0,0 +1,120 @@
+"""Fleet-wide scheduling of the polls of all the BSK Zephyr config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+# Device fetches running at the same time across all the entries
+MAX_CONCURRENT_FETCHES = 4
+# Length of the fleet cycle, in seconds: the members own evenly spaced slots
+# of it whatever their poll interval, the fetch statistics are aggregated on it
+CYCLE_LENGTH = 10
+
+
+@callback
+def async_get_fleet_scheduler(hass: HomeAssistant) -> FleetPollScheduler:
+    """Return the scheduler shared by all the config entries."""
+    if DATA_FLEET not in hass.data:
+        hass.data[DATA_FLEET] = FleetPollScheduler()
+    return hass.data[DATA_FLEET]
+
+
+class FleetPollScheduler:
+    """Spread the polls of the coordinators evenly and bound the fetches."""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_FETCHES,
+        cycle_length: float = CYCLE_LENGTH,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._members: list[str] = []
+        self.cycle_length = cycle_length
+        self._cycle_start = 0.0
+        self._cycle: dict[str, float] = self._new_cycle()
+        self.last_cycle: dict[str, float] = {}
+
+    @callback
+    def async_register(self, member_id: str) -> None:
+        if member_id not in self._members:
+            self._members.append(member_id)
+
+    @callback
+    def async_unregister(self, member_id: str) -> None:
+        if member_id in self._members:
+            self._members.remove(member_id)
+
+    def next_poll_delay(self, member_id: str, interval: float) -> float:
+        """Seconds until the next poll of the member, interval moved to its slot.
+
+        The slots are offsets of the shared cycle, not of the member interval,
+        so members on different adaptive intervals still poll apart. The poll
+        moves to the slot nearest to interval, by at most half a cycle.
+        """
+        if member_id not in self._members or len(self._members) < 2 or interval <= 0:
+            return interval
+        offset = self.cycle_length * self._members.index(member_id) / len(self._members)
+        shift = (offset - (time.monotonic() + interval)) % self.cycle_length
+        if shift > self.cycle_length / 2:
+            shift -= self.cycle_length
+        return max(interval + shift, interval / 2)
+
+    @asynccontextmanager
+    async def fetch_slot(self) -> AsyncIterator[None]:
+        """Hold one of the fleet fetch slots while fetching a device.
+
+        Only the scheduled polls take a slot, the refreshes confirming a
+        command must not queue behind the polls of the other entries.
+        """
+        async with self._semaphore:
+            start = time.monotonic()
+            self._roll_cycle(start)
+            try:
+                yield
+            finally:
+                end = time.monotonic()
+                cycle = self._cycle
+                cycle["fetches"] += 1
+                cycle["fetch_time"] += end - start
+                cycle["first_start"] = cycle["first_start"] or start
+                cycle["last_end"] = max(cycle["last_end"], end)
+
+    def _roll_cycle(self, now: float) -> None:
+        cycle_start = now - now % self.cycle_length
+        if cycle_start == self._cycle_start:
+            return
+        if self._cycle["fetches"]:
+            cycle = self._cycle
+            self.last_cycle = {
+                "fetches": cycle["fetches"],
+                "fetch_time": round(cycle["fetch_time"], 3),
+                "duration": round(cycle["last_end"] - cycle["first_start"], 3),
+            }
+            _LOGGER.debug("Fleet poll cycle: %s", self.last_cycle)
+        self._cycle_start = cycle_start
+        self._cycle = self._new_cycle()
+
+    @staticmethod
+    def _new_cycle() -> dict[str, float]:
+        return {"fetches": 0, "fetch_time": 0.0, "first_start": 0.0, "last_end": 0.0}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "members": len(self._members),
+            "max_concurrent_fetches": self.max_concurrent,
+            "last_cycle": self.last_cycle,
+        }
@@ -0,0 +1,168 @@
+"""Request metrics of the HTTP exchanges with a Zephyr device."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+# Upper bounds of the latency buckets in seconds, the last bucket has no bound
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests behind the recent latency and error rate
+RECENT_REQUESTS = 100
+
+
+class LatencyHistogram:
+    """Request latencies counted in the fixed LATENCY_BUCKETS."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """(upper bound, requests up to it), as the OpenMetrics buckets."""
+        bounds = (*LATENCY_BUCKETS, float("inf"))
+        result, running = [], 0
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "buckets": {f"le_{bound}": count for bound, count in self.cumulative()},
+        }
+
+
+class EndpointMetrics:
+    """Counters of one endpoint, as "GET /" or "POST /fan"."""
+
+    __slots__ = ("requests", "errors", "bytes_received", "latency")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors: Counter[str] = Counter()
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+        }
+
+
+def error_name(err: BaseException) -> str:
+    """Name an error is counted under, the HTTP status for the error responses."""
+    status = getattr(err, "status", None)
+    if isinstance(status, int) and status >= 400:
+        return f"HTTP {status}"
+    return type(err).__name__
+
+
+def is_answered(err: BaseException) -> bool:
+    """Return True if the device answered the request that raised err.
+
+    Besides the error statuses, a body that is not the expected JSON is an
+    answer: aiohttp raises ContentTypeError with the status, or the bare
+    JSONDecodeError (a ValueError) when the content type is not checked.
+    """
+    return isinstance(err, ValueError) or isinstance(getattr(err, "status", None), int)
+
+
+class ClientMetrics:
+    """Per-endpoint counters of a client, plus the recent latency and error rate.
+
+    Only the device exchange is timed, not the wait in the request queue. HTTP
+    error statuses and unexpected bodies are answers: they are counted by
+    endpoint, not in the error rate, which tracks the requests the device did
+    not answer.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self._recent_polls: deque[float] = deque(maxlen=RECENT_REQUESTS)
+        self._recent_failures: deque[bool] = deque(maxlen=RECENT_REQUESTS)
+
+    def endpoint(self, method: str, path: str) -> EndpointMetrics:
+        key = f"{method} {path or '/'}"
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        return metrics
+
+    def timed(
+        self, method: str, path: str, request: Callable[[], Awaitable[_T]]
+    ) -> Callable[[], Awaitable[_T]]:
+        """Wrap request so every run is recorded under the endpoint."""
+        metrics = self.endpoint(method, path)
+
+        async def timed_request() -> _T:
+            start = time.monotonic()
+            try:
+                result = await request()
+            except asyncio.CancelledError:
+                # preempted by a command or shut down, not an outcome of the device
+                raise
+            except Exception as err:
+                self._record(metrics, method, time.monotonic() - start, err)
+                raise
+            self._record(metrics, method, time.monotonic() - start, None)
+            return result
+
+        return timed_request
+
+    def received(self, method: str, path: str, size: int) -> None:
+        self.endpoint(method, path).bytes_received += size
+
+    def _record(
+        self, metrics: EndpointMetrics, method: str, seconds: float, err: Exception | None
+    ) -> None:
+        metrics.requests += 1
+        metrics.latency.observe(seconds)
+        failed = False
+        if err is not None:
+            metrics.errors[error_name(err)] += 1
+            failed = not is_answered(err)
+        self._recent_failures.append(failed)
+        if method == "GET":
+            self._recent_polls.append(seconds)
+
+    @property
+    def poll_latency_p95(self) -> float | None:
+        """95th percentile of the recent status reads in seconds, None before the first."""
+        if not self._recent_polls:
+            return None
+        latencies = sorted(self._recent_polls)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    @property
+    def error_rate(self) -> float | None:
+        """Fraction of the recent requests the device did not answer."""
+        if not self._recent_failures:
+            return None
+        return sum(self._recent_failures) / len(self._recent_failures)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "poll_latency_p95": self.poll_latency_p95,
+            "error_rate": self.error_rate,
+            "endpoints": {key: metrics.as_dict() for key, metrics in self.endpoints.items()},
+        }
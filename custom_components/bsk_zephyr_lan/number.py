@@ -10,6 +10,12 @@ from dataclasses import replace
 
 _LOGGER = logging.getLogger(__name__)
 
+# Slider settings collapsed to the last value by the coordinator debouncer
+DEBOUNCED_ENDPOINTS = {
+    "fan_speed": "/fan",
+    "humidity_boost_level": "/humid",
+}
+
 NUMBER_TYPES: tuple[NumberEntityDescription, ...] = (
     NumberEntityDescription(
         name="Humidity Boost",
@@ -48,22 +54,25 @@ class BSKZephyrNumber(BSKZephyrEntity, NumberEntity):
         coordinator: BSKDataUpdateCoordinator,
         description: NumberEntityDescription,
     ):
-        min = coordinator.api.persistent_data.get(f"{description.key}_min", None)
+        persistent_data = coordinator.client_for(groupID).persistent_data
+        min = persistent_data.get(f"{description.key}_min", None)
         if min:
             description = replace(description, native_min_value=min)
-        max = coordinator.api.persistent_data.get(f"{description.key}_max", None)
+        max = persistent_data.get(f"{description.key}_max", None)
         if max:
             description = replace(description, native_max_value=max)
         super().__init__(groupID, coordinator, description)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        super()._handle_coordinator_update()
-        self._attr_native_value = self.property_value
+    @property
+    def native_value(self):
+        # read when the state is written, after the coordinator update
+        return self.property_value
 
     async def async_set_native_value(self, value):
-        await self.coordinator.api.control_device(
-            self.groupID, **{self.entity_description.key: value}
-        )
-        await self.coordinator.async_status_refresh()
+        endpoint = DEBOUNCED_ENDPOINTS.get(self.entity_description.key)
+        if endpoint:
+            await self.async_control_debounced(
+                endpoint, **{self.entity_description.key: int(value)}
+            )
+            return
+        await self.async_control(**{self.entity_description.key: value})
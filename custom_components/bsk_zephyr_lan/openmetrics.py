@@ -0,0 +1,210 @@
+"""Readings and client metrics of all the devices in the OpenMetrics text format."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from http import HTTPStatus
+from typing import NamedTuple
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .bsk_api import ZephyrDevice
+from .const import DOMAIN
+from .metrics import ClientMetrics
+
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "bsk_zephyr"
+
+# ZephyrDevice field, family name, unit, help. Booleans are exported as 0/1,
+# the temperature in celsius whatever the unit of the device
+READINGS: tuple[tuple[str, str, str | None, str], ...] = (
+    ("temperature", "temperature_celsius", "celsius", "Temperature read by the device"),
+    ("humidity", "humidity_percent", "percent", "Relative humidity read by the device"),
+    ("fan_speed", "fan_speed_percent", "percent", "Fan speed"),
+    ("filter_timer", "filter_timer_hours", "hours", "Hours left before the filter change"),
+    ("hygiene_status", "hygiene_status", None, "Capsule status"),
+    ("wifi_rssi", "wifi_rssi_dbm", "dbm", "Wi-Fi signal strength"),
+    ("power", "power", None, "1 when the unit is on"),
+    ("humidity_boost_running", "humidity_boost_running", None, "1 while the humidity boost runs"),
+)
+
+
+class DeviceMetrics(NamedTuple):
+    """What is exported for one device, read from the coordinator cache."""
+
+    device: ZephyrDevice
+    host: str | None
+    metrics: ClientMetrics
+    stale: bool
+    age: float | None
+
+
+class MetricFamily:
+    """Samples of one metric, rendered together as OpenMetrics requires."""
+
+    def __init__(self, name: str, kind: str, help_text: str, unit: str | None = None) -> None:
+        self.name = f"{PREFIX}_{name}"
+        self.kind = kind
+        self.help_text = help_text
+        self.unit = unit
+        self.samples: list[tuple[str, dict[str, str], float]] = []
+
+    def add(self, labels: dict[str, str], value: float, suffix: str = "") -> None:
+        self.samples.append((suffix, labels, value))
+
+    def render(self, lines: list[str]) -> None:
+        if not self.samples:
+            return
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {escape(self.help_text)}")
+        for suffix, labels, value in self.samples:
+            rendered = ",".join(f'{key}="{escape(str(label))}"' for key, label in labels.items())
+            lines.append(f"{self.name}{suffix}{{{rendered}}} {format_value(value)}")
+
+
+def escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def reading_value(device: ZephyrDevice, field: str) -> float:
+    """Return the reading of field in the unit of its metric family."""
+    value = getattr(device, field)
+    if field == "temperature" and device.temperature_unit == UnitOfTemperature.FAHRENHEIT:
+        return round(
+            TemperatureConverter.convert(
+                value, UnitOfTemperature.FAHRENHEIT, UnitOfTemperature.CELSIUS
+            ),
+            2,
+        )
+    return value
+
+
+def render_openmetrics(devices: Iterable[DeviceMetrics]) -> str:
+    """Return the exposition of devices, ended by # EOF."""
+    info = MetricFamily("device", "info", "Model and firmware of the device")
+    up = MetricFamily("up", "gauge", "1 while the cached readings are not stale")
+    age = MetricFamily("data_age_seconds", "gauge", "Age of the cached readings", "seconds")
+    readings = {
+        field: MetricFamily(name, "gauge", help_text, unit)
+        for field, name, unit, help_text in READINGS
+    }
+    poll_latency = MetricFamily(
+        "poll_latency_p95_seconds", "gauge",
+        "95th percentile of the latency of the last status reads", "seconds",
+    )
+    requests = MetricFamily("requests", "counter", "Requests sent to the device")
+    errors = MetricFamily("request_errors", "counter", "Failed requests, by error")
+    received = MetricFamily("received_bytes", "counter", "Bytes received from the device", "bytes")
+    duration = MetricFamily(
+        "request_duration_seconds", "histogram", "Latency of the requests", "seconds"
+    )
+
+    for exported in devices:
+        device = exported.device
+        labels = {"device_id": device.device_id}
+        info.add(
+            {
+                **labels,
+                "name": device.device_name,
+                "model": device.device_model,
+                "version": device.device_version,
+                "host": exported.host or "",
+            },
+            1,
+            "_info",
+        )
+        up.add(labels, not exported.stale)
+        if exported.age is not None:
+            age.add(labels, round(exported.age, 3))
+        for field, family in readings.items():
+            family.add(labels, reading_value(device, field))
+
+        metrics = exported.metrics
+        if metrics.poll_latency_p95 is not None:
+            poll_latency.add(labels, metrics.poll_latency_p95)
+        for endpoint, counters in metrics.endpoints.items():
+            method, path = endpoint.split(" ", 1)
+            endpoint_labels = {**labels, "method": method, "path": path}
+            requests.add(endpoint_labels, counters.requests, "_total")
+            for error, count in counters.errors.items():
+                errors.add({**endpoint_labels, "error": error}, count, "_total")
+            received.add(endpoint_labels, counters.bytes_received, "_total")
+            for bound, count in counters.latency.cumulative():
+                duration.add({**endpoint_labels, "le": format_value(bound)}, count, "_bucket")
+            duration.add(endpoint_labels, counters.latency.count, "_count")
+            duration.add(endpoint_labels, counters.latency.total, "_sum")
+
+    lines: list[str] = []
+    for family in (
+        info, up, age, *readings.values(), poll_latency, requests, errors, received, duration
+    ):
+        family.render(lines)
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+@callback
+def async_cached_devices(hass: HomeAssistant) -> list[DeviceMetrics]:
+    """Devices of all the loaded entries, as the coordinators last read them."""
+    devices = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is not ConfigEntryState.LOADED:
+            continue
+        coordinator = entry.runtime_data.coordinator
+        for group_id, device in (coordinator.data or {}).items():
+            client = coordinator.client_for(group_id)
+            devices.append(
+                DeviceMetrics(
+                    device,
+                    client.host,
+                    client.metrics,
+                    coordinator.is_stale(group_id),
+                    coordinator.data_age(group_id),
+                )
+            )
+    return devices
+
+
+class BSKZephyrMetricsView(HomeAssistantView):
+    """Scrape target for the whole fleet, the devices are not contacted."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass: HomeAssistant = request.app[KEY_HASS]
+        return web.Response(
+            status=HTTPStatus.OK,
+            body=render_openmetrics(async_cached_devices(hass)).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+
+@callback
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Register the view once, HA does not remove the views."""
+    if hass.data.get(DATA_METRICS_VIEW):
+        return
+    hass.http.register_view(BSKZephyrMetricsView())
+    hass.data[DATA_METRICS_VIEW] = True
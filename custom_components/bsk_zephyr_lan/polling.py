@@ -0,0 +1,59 @@
+"""Adaptive polling interval for the BSK Zephyr coordinator."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+# Seconds of fast polling after a command
+FAST_POLL_PERIOD = 30
+# Interval growth for every poll with stable readings
+BACKOFF_FACTOR = 1.5
+# Reading changes that bring the interval back to the minimum
+TEMPERATURE_THRESHOLD = 0.2
+HUMIDITY_THRESHOLD = 1.0
+
+
+class AdaptivePollInterval:
+    """Poll fast while things happen, back off while readings are stable."""
+
+    def __init__(self, min_interval: float, max_interval: float) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.interval = min_interval
+        self._fast_until = 0.0
+        # Readings of the last snap back, per device
+        self._reference: dict[str, tuple[float, float]] = {}
+
+    def command_sent(self) -> float:
+        """Switch to fast polling for a while after a command."""
+        self._fast_until = time.monotonic() + FAST_POLL_PERIOD
+        self.interval = self.min_interval
+        return self.interval
+
+    def failed(self) -> float:
+        """Retry soon after a failed poll, the stale data must not expire first."""
+        self.interval = self.min_interval
+        return self.interval
+
+    def update(self, devices: Iterable[tuple[str, Any]]) -> float:
+        """Return the next interval given the (group_id, device) just polled."""
+        active = time.monotonic() < self._fast_until
+        for group_id, device in devices:
+            reading = (device.temperature, device.humidity)
+            reference = self._reference.get(group_id)
+            if (
+                reference is None
+                or abs(reading[0] - reference[0]) >= TEMPERATURE_THRESHOLD
+                or abs(reading[1] - reference[1]) >= HUMIDITY_THRESHOLD
+            ):
+                self._reference[group_id] = reading
+                active = True
+            if device.humidity_boost_running:
+                active = True
+        if active:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * BACKOFF_FACTOR, self.max_interval)
+        return self.interval
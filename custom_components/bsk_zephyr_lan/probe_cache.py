@@ -0,0 +1,47 @@
+"""Devices read by the config flow, handed over to the entry setup."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+DATA_PROBES = f"{DOMAIN}_probes"
+
+# Seconds a probe result can replace the first fetch of the device
+PROBE_TTL = 60
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    raw_data: dict[str, Any]
+    probed_at: float
+    # status transport detected by the probe, None if not detected
+    transport: str | None = None
+
+
+@callback
+def async_store_probe(
+    hass: HomeAssistant,
+    host: str,
+    raw_data: dict[str, Any],
+    transport: str | None = None,
+) -> None:
+    """Keep the raw data just read from the device at host, and its transport."""
+    probes: dict[str, ProbeResult] = hass.data.setdefault(DATA_PROBES, {})
+    now = time.monotonic()
+    for device_id in [key for key, probe in probes.items() if now - probe.probed_at > PROBE_TTL]:
+        del probes[device_id]
+    probes[raw_data["device_id"]] = ProbeResult(host, raw_data, now, transport)
+
+
+@callback
+def async_pop_probe(hass: HomeAssistant, device_id: str) -> ProbeResult | None:
+    """Return the recent probe of device_id, once."""
+    probe = hass.data.get(DATA_PROBES, {}).pop(device_id, None)
+    if probe is None or time.monotonic() - probe.probed_at > PROBE_TTL:
+        return None
+    return probe
@@ -0,0 +1,93 @@
+"""Serialize the HTTP exchanges with a single Zephyr device."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+
+class RequestScheduler:
+    """Allow one outstanding request per device, commands before polls.
+
+    A command arriving while a poll is in flight cancels the poll, which is
+    queued again behind the command and transparently retried.
+    """
+
+    def __init__(self) -> None:
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._inflight: asyncio.Task | None = None
+        self._inflight_priority = PRIORITY_POLL
+        self._preempted: set[asyncio.Task] = set()
+        self.preempted_polls = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    async def run(
+        self, request: Callable[[], Awaitable[Any]], priority: int = PRIORITY_POLL
+    ) -> Any:
+        """Run request when the device is free and return its result."""
+        # A preempted poll keeps its place in the queue
+        sequence = next(self._sequence)
+        while True:
+            await self._acquire(priority, sequence)
+            task = asyncio.ensure_future(request())
+            self._inflight = task
+            self._inflight_priority = priority
+            try:
+                await asyncio.wait((task,))
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                self._inflight = None
+                self._release()
+            if task in self._preempted:
+                self._preempted.discard(task)
+                if task.cancelled():
+                    _LOGGER.debug("Poll preempted by a command, queued again")
+                    continue
+            return task.result()
+
+    async def _acquire(self, priority: int, sequence: int) -> None:
+        if not self._busy and not self.queued:
+            self._busy = True
+            return
+        if (
+            priority == PRIORITY_COMMAND
+            and self._inflight is not None
+            and self._inflight_priority > priority
+            and not self._inflight.done()
+        ):
+            self.preempted_polls += 1
+            self._preempted.add(self._inflight)
+            self._inflight.cancel()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, sequence, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over while being cancelled
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            *_, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._busy = False
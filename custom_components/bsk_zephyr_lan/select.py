@@ -49,7 +49,4 @@ class BSKZephyrSelect(BSKZephyrEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         if option == self.state:
             return  # niente da fare se è già selezionato
-        await self.coordinator.api.control_device(
-            self.groupID, **{self.entity_description.key: option}
-        )
-        await self.coordinator.async_status_refresh()
+        await self.async_control(**{self.entity_description.key: option})
@@ -9,7 +9,7 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
+from homeassistant.const import PERCENTAGE, UnitOfTemperature, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
 
@@ -74,6 +74,48 @@ SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
 )
 
 
+DATA_AGE_DESCRIPTION = SensorEntityDescription(
+    name="Data Age",
+    key="data_age",
+    icon="mdi:timer-sand",
+    device_class=SensorDeviceClass.DURATION,
+    state_class=SensorStateClass.MEASUREMENT,
+    native_unit_of_measurement=UnitOfTime.SECONDS,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+)
+
+# Client metrics, converted to the unit of the sensor
+CLIENT_METRIC_VALUES = {
+    "poll_latency": lambda metrics: metrics.poll_latency_p95 and metrics.poll_latency_p95 * 1000,
+    "error_rate": lambda metrics: metrics.error_rate and metrics.error_rate * 100,
+}
+
+CLIENT_METRIC_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        name="Poll Latency",
+        key="poll_latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        name="Error Rate",
+        key="error_rate",
+        icon="mdi:wifi-alert",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: BSKZephyrConfigEntry, async_add_entities
 ) -> None:
@@ -82,6 +124,13 @@ async def async_setup_entry(
             BSKZephyrSensor(groupID, entry.runtime_data.coordinator, description)
             for description in SENSOR_TYPES
         )
+        async_add_entities(
+            [BSKZephyrDataAgeSensor(groupID, entry.runtime_data.coordinator, DATA_AGE_DESCRIPTION)]
+        )
+        async_add_entities(
+            BSKZephyrClientMetricSensor(groupID, entry.runtime_data.coordinator, description)
+            for description in CLIENT_METRIC_DESCRIPTIONS
+        )
 
 
 class BSKZephyrSensor(BSKZephyrEntity, SensorEntity):
@@ -92,3 +141,44 @@ class BSKZephyrSensor(BSKZephyrEntity, SensorEntity):
     @property
     def state(self):
         return self.property_value
+
+
+class BSKZephyrPolledSensor(BSKZephyrSensor):
+    """Value computed when the state is written, polled by HA."""
+    # the value changes between the updates of the device, polling refreshes it
+    _attr_subscribed_keys = ("updated_at",)
+
+    @property
+    def should_poll(self) -> bool:
+        return True
+
+    @property
+    def state(self):
+        return self._get_value_from_path()
+
+    async def async_update(self) -> None:
+        """Nothing to fetch, the value is read from the coordinator."""
+
+
+class BSKZephyrDataAgeSensor(BSKZephyrPolledSensor):
+    """Seconds since the device data was last read."""
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.data_age(self.groupID) is not None
+
+    def _get_value_from_path(self):
+        age = self.coordinator.data_age(self.groupID)
+        return None if age is None else round(age)
+
+
+class BSKZephyrClientMetricSensor(BSKZephyrPolledSensor):
+    """Recent poll latency or error rate of the client, also while the device is down."""
+
+    @property
+    def available(self) -> bool:
+        return self._get_value_from_path() is not None
+
+    def _get_value_from_path(self):
+        value = CLIENT_METRIC_VALUES[self.entity_description.key](self.api.metrics)
+        return None if value is None else round(value, 1)
@@ -0,0 +1,140 @@
+"""Parser for the BSK Zephyr local status page."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Mapping
+from typing import Any, NamedTuple
+
+# Every reading on the status page is rendered as <p><b>Key:</b> Value</p>
+STATUS_LINE_PATTERN = re.compile(r"<p><b>([^<:]+):</b>([^<]*)</p>")
+
+# At least one of these must be on the page to consider it a Zephyr status page
+REQUIRED_TARGETS = ("fan_speed", "operation_mode")
+
+
+def to_bool(value: str) -> bool:
+    if value == "0":
+        return False
+    if value == "1":
+        return True
+    v = str(value).strip().lower()
+    return v in ("1", "true", "on", "yes")
+
+
+def to_hours(value: str) -> int:
+    return int(float(value))
+
+
+class StatusField(NamedTuple):
+    """How a status page key is stored in the client raw data."""
+
+    target: str
+    decoder: Callable[[str], Any]
+    units: tuple[str, ...] = ()
+
+
+# Keys are the page labels normalized as 'Fan Speed' -> 'fan_speed'
+STATUS_FIELDS: dict[str, StatusField] = {
+    "device_id": StatusField("device_id", str),
+    "version": StatusField("device_version", str),
+    "model": StatusField("device_model", str),
+    "ssid": StatusField("wifi_ssid", str),
+    "rssi": StatusField("wifi_rssi", int, ("dBm",)),
+    "ip": StatusField("wifi_ip", str),
+    "power": StatusField("power", to_bool),
+    "fan_speed": StatusField("fan_speed", int, ("%",)),
+    "temperature": StatusField("temperature", float, ("°C", "°F")),
+    "humidity": StatusField("humidity", float, ("%",)),
+    "operation_mode": StatusField("operation_mode", str),
+    "set_humidity": StatusField("humidity_boost_level_raw", int, ("%",)),
+    "humidity_boost": StatusField("humidity_boost_running", to_bool),
+    "buzzer": StatusField("buzzer", to_bool),
+    "filter_timer": StatusField("filter_timer", to_hours, ("h",)),
+    "hygiene_status": StatusField("hygiene_status", int, ("%",)),
+}
+
+
+def normalize_key(label: str) -> str:
+    """Convert 'Fan Speed' -> 'fan_speed'."""
+    return label.strip().lower().replace(" ", "_")
+
+
+class StatusPageParser:
+    """Decode the status page in a single pass using a precomputed field table."""
+
+    def __init__(self, fields: Mapping[str, StatusField] | None = None) -> None:
+        self._fields: dict[str, StatusField] = dict(fields or STATUS_FIELDS)
+        self._targets: dict[str, StatusField] = {
+            field.target: field for field in self._fields.values()
+        }
+        # Raw page label -> field, filled the first time a label is seen
+        self._labels: dict[str, StatusField] = {}
+
+    def _field_for_label(self, label: str) -> StatusField:
+        field = self._labels.get(label)
+        if field is None:
+            key = normalize_key(label)
+            field = self._fields.get(key) or StatusField(key, str)
+            self._labels[label] = field
+        return field
+
+    def decode(self, field: StatusField, value: str) -> tuple[Any, str | None]:
+        """Return the decoded value and the unit found on it, if any."""
+        v = value.strip()
+        unit = None
+        if field.units:
+            number, sep, suffix = v.rpartition(" ")
+            if sep and suffix in field.units:
+                v = number.strip()
+                unit = suffix
+        try:
+            return field.decoder(v), unit
+        except ValueError:
+            return value.strip(), None
+
+    def parse(self, html: str) -> dict[str, Any]:
+        """Parse all the readings of the page."""
+        data: dict[str, Any] = {}
+        labels = self._labels
+        for label, value in STATUS_LINE_PATTERN.findall(html):
+            field = labels.get(label) or self._field_for_label(label)
+            if field.units:
+                decoded, unit = self.decode(field, value)
+                data[field.target] = decoded
+                if unit:
+                    data[f"{field.target}_unit"] = unit
+                continue
+            try:
+                data[field.target] = field.decoder(value.strip())
+            except ValueError:
+                data[field.target] = value.strip()
+        return data
+
+    def parse_mapping(self, values: Mapping[str, Any]) -> dict[str, Any]:
+        """Decode a JSON payload, keys can be page labels or target names.
+
+        Keys that are not status fields (e.g. a command result flag) are ignored.
+        """
+        data: dict[str, Any] = {}
+        for key, value in values.items():
+            name = normalize_key(str(key))
+            field = self._fields.get(name) or self._targets.get(name)
+            if field is None:
+                continue
+            if isinstance(value, str):
+                value, unit = self.decode(field, value)
+                if unit:
+                    data[f"{field.target}_unit"] = unit
+            elif field.decoder is to_bool:
+                value = bool(value)
+            data[field.target] = value
+        return data
+
+    def is_status_field(self, target: str) -> bool:
+        """Return True if target is the raw data key of a known status field."""
+        return target in self._targets
+
+    @staticmethod
+    def is_valid(data: Mapping[str, Any]) -> bool:
+        return any(key in data for key in REQUIRED_TARGETS)
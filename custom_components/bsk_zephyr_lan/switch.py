@@ -47,7 +47,4 @@ class BSKZephyrSwitch(BSKZephyrEntity, SwitchEntity):
         await self.set_device_on_off(True)
 
     async def set_device_on_off(self, state: bool) -> None:
-        await self.coordinator.api.control_device(
-            self.groupID, **{self.entity_description.key: state}
-        )
-        await self.coordinator.async_status_refresh()
+        await self.async_control(**{self.entity_description.key: state})
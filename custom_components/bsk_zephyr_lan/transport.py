@@ -0,0 +1,97 @@
+"""How the status of a BSK Zephyr device is read."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from aiohttp import ClientResponseError
+
+from .status_parser import StatusPageParser
+
+_LOGGER = logging.getLogger(__name__)
+
+# Client GET, as BSKZephyrLanClient._get(path, asText=...)
+Getter = Callable[..., Awaitable[Any]]
+
+HTML_TRANSPORT = "html"
+# Paths the firmwares answer with the status as JSON, probed at the first
+# contact. No documented firmware has one yet: add the path of a firmware that
+# does, a guessed path costs a GET per device and a 404 in its log.
+JSON_STATUS_PATHS: tuple[str, ...] = ()
+
+
+class InvalidStatusError(ValueError):
+    """The device answered without a usable status"""
+
+
+class HtmlStatusTransport:
+    """Scrape the status page, supported by every firmware."""
+
+    name = HTML_TRANSPORT
+
+    def __init__(self, parser: StatusPageParser) -> None:
+        self._parser = parser
+
+    async def async_fetch(self, get: Getter) -> dict[str, Any]:
+        html = await get("", asText=True)
+        data = self._parser.parse(html)
+        if not self._parser.is_valid(data):
+            raise InvalidStatusError(f"No valid data received: {html}")
+        return data
+
+
+class JsonStatusTransport:
+    """Read the status from a JSON endpoint."""
+
+    def __init__(self, parser: StatusPageParser, path: str) -> None:
+        self._parser = parser
+        self.path = path
+        self.name = f"json:{path}"
+
+    async def async_fetch(self, get: Getter) -> dict[str, Any]:
+        values = await get(self.path, asText=False)
+        if not isinstance(values, Mapping):
+            raise InvalidStatusError(f"No JSON status on {self.path}: {values}")
+        data = self._parser.parse_mapping(values)
+        if not self._parser.is_valid(data):
+            raise InvalidStatusError(f"No valid data received on {self.path}: {values}")
+        return data
+
+
+StatusTransport = HtmlStatusTransport | JsonStatusTransport
+
+
+def transport_from_name(name: str | None, parser: StatusPageParser) -> StatusTransport | None:
+    """Return the transport saved as name, None if unknown."""
+    if name == HTML_TRANSPORT:
+        return HtmlStatusTransport(parser)
+    if name and name.startswith("json:"):
+        return JsonStatusTransport(parser, name.removeprefix("json:"))
+    return None
+
+
+async def async_detect_transport(
+    get: Getter, parser: StatusPageParser, reference: Mapping[str, Any]
+) -> StatusTransport:
+    """Return the JSON transport reporting every field of reference, else the HTML one.
+
+    reference is the data just read from the status page. Only the status
+    fields are compared: the *_unit keys are added by the page parser and the
+    raw data keeps the units read there, unknown page labels are not used.
+    """
+    expected = {key for key in reference if parser.is_status_field(key)}
+    for path in JSON_STATUS_PATHS:
+        transport = JsonStatusTransport(parser, path)
+        try:
+            data = await transport.async_fetch(get)
+        except (ClientResponseError, ValueError, TimeoutError) as err:
+            # the other errors, e.g. the device not answering, are the caller's
+            _LOGGER.debug("No JSON status on %s: %s", path, err)
+            continue
+        missing = expected - set(data)
+        if not missing:
+            return transport
+        _LOGGER.debug("JSON status on %s lacks %s", path, missing)
+    return HtmlStatusTransport(parser)
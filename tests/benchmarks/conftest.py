@@ -0,0 +1,97 @@
+"""Fixtures of the benchmarks of the hot paths.
+
+Run with: pip install -r requirements_test.txt && pytest tests/benchmarks
+
+The client benchmarks import bsk_api without Home Assistant (tests/conftest.py),
+the coordinator ones run a throwaway instance (tools/ha_instance.py) and are
+skipped when homeassistant is not installed. The simulated units come from
+tools/zephyr_simulator.py.
+
+Besides the pytest-benchmark table, a summary reports the p50 and p99 latency
+of one op and the peak memory traced by tracemalloc while one op runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import statistics
+import tracemalloc
+import types
+from collections.abc import Callable, Coroutine
+from pathlib import Path
+
+import pytest
+
+PAGES = sorted((Path(__file__).resolve().parents[2] / "tools" / "status_pages").glob("*.html"))
+
+# Runs of an op under tracemalloc, after the timed rounds
+TRACED_RUNS = 20
+
+_SUMMARY: list[tuple[str, dict]] = []
+
+
+def run_now(coro: Coroutine):
+    """Run a coroutine that never suspends, without the overhead of a loop."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("The coroutine waited for I/O, run it in the event loop")
+
+
+@pytest.fixture(scope="session")
+def bsk_api() -> types.ModuleType:
+    """bsk_api imported without Home Assistant, skipping the package __init__."""
+    return importlib.import_module("bsk_zephyr_lan.bsk_api")
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def measure(benchmark, request) -> Callable[[Callable[[], object], int], None]:
+    """Benchmark a zero-argument callable, one op per round."""
+
+    def measure(op: Callable[[], object], rounds: int) -> None:
+        benchmark.pedantic(op, rounds=rounds, warmup_rounds=min(rounds, 20))
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(TRACED_RUNS):
+                current = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                op()
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_traced_bytes"] = statistics.median(peaks)
+        if benchmark.stats is not None and len(benchmark.stats.stats.data) > 1:
+            quantiles = statistics.quantiles(benchmark.stats.stats.data, n=100)
+            benchmark.extra_info["p50_s"] = quantiles[49]
+            benchmark.extra_info["p99_s"] = quantiles[98]
+        _SUMMARY.append((request.node.name, benchmark.extra_info))
+
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not _SUMMARY:
+        return
+    terminalreporter.section("latency percentiles and traced memory")
+    terminalreporter.write_line(
+        f"{'benchmark':<48}{'p50 us':>10}{'p99 us':>10}{'peak KiB':>10}"
+    )
+    for name, info in _SUMMARY:
+        p50, p99 = info.get("p50_s"), info.get("p99_s")
+        terminalreporter.write_line(
+            f"{name:<48}"
+            f"{'-' if p50 is None else f'{p50 * 1e6:.1f}':>10}"
+            f"{'-' if p99 is None else f'{p99 * 1e6:.1f}':>10}"
+            f"{info['peak_traced_bytes'] / 1024:>10.1f}"
+        )
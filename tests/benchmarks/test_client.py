@@ -0,0 +1,69 @@
+"""Client hot paths: status parse, model build and command round trip."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from conftest import PAGES, run_now
+
+from zephyr_simulator import start_units, stop_units
+
+ROUNDS = 2000
+COMMAND_ROUNDS = 300
+
+
+def offline_client(bsk_api, html: str):
+    """Client reading html as status page, without network."""
+    client = bsk_api.BSKZephyrLanClient(None, "bench.invalid")
+    client.persistent_data[client.STATUS_TRANSPORT_KEY] = "html"
+
+    async def get(path, headers=None, params=None, asText=True):
+        return html
+
+    client._get = get
+    run_now(client.list_devices())
+    return client
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_fetch_device_data(bsk_api, measure, page):
+    client = offline_client(bsk_api, page.read_text(encoding="utf-8"))
+    measure(lambda: run_now(client.fetch_device_data()), ROUNDS)
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_list_devices_build(bsk_api, measure, page):
+    client = offline_client(bsk_api, page.read_text(encoding="utf-8"))
+
+    def rebuild():
+        # forget the previous model, as after a poll with changed values
+        client._fingerprint = ()
+        return run_now(client.list_devices(True))
+
+    measure(rebuild, ROUNDS)
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_list_devices_unchanged(bsk_api, measure, page):
+    client = offline_client(bsk_api, page.read_text(encoding="utf-8"))
+    measure(lambda: run_now(client.list_devices(True)), ROUNDS)
+
+
+def test_control_device_round_trip(bsk_api, measure, loop):
+    runners, units, addresses = loop.run_until_complete(start_units(1))
+    client = bsk_api.BSKZephyrLanClient(None, addresses[0])
+    try:
+        group_id = next(iter(loop.run_until_complete(client.list_devices())))
+        speeds = itertools.cycle((30, 55))
+        measure(
+            lambda: loop.run_until_complete(
+                client.control_device(group_id, fan_speed=next(speeds))
+            ),
+            COMMAND_ROUNDS,
+        )
+        assert units[0].fan_speed in (30, 55)
+    finally:
+        loop.run_until_complete(client.close())
+        loop.run_until_complete(stop_units(runners))
@@ -0,0 +1,93 @@
+"""Coordinator hot paths: update fan-out to the six platforms and full poll."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from ha_instance import async_add_entry, ha_instance  # noqa: E402
+from zephyr_simulator import start_units, stop_units  # noqa: E402
+
+DEVICES = 3
+ROUNDS = 200
+
+
+@pytest.fixture(scope="module")
+def hass_entry(loop):
+    """A loaded entry for DEVICES simulated units, in a throwaway instance."""
+    runners, units, addresses = loop.run_until_complete(start_units(DEVICES))
+    instance = ha_instance()
+    hass = loop.run_until_complete(instance.__aenter__())
+    try:
+        entry = loop.run_until_complete(
+            async_add_entry(
+                hass, {unit.device_id: address for unit, address in zip(units, addresses)}
+            )
+        )
+        yield hass, entry
+    finally:
+        loop.run_until_complete(instance.__aexit__(None, None, None))
+        loop.run_until_complete(stop_units(runners))
+
+
+def changed_copy(device):
+    """Copy of device with at least one field of every entity platform changed."""
+    fan_speed_enum = type(device.fan_speed_enum)
+    operation_mode_enum = type(device.operation_mode_enum)
+    fan_speed = 55 if device.fan_speed < 55 else 30
+    return device.model_copy(
+        update={
+            "temperature": device.temperature + 0.5,
+            "humidity": device.humidity + 1.0,
+            "fan_speed": fan_speed,
+            "fan_speed_enum": fan_speed_enum.medium if fan_speed == 55 else fan_speed_enum.low,
+            "operation_mode_enum": (
+                operation_mode_enum.supply
+                if device.operation_mode_enum is operation_mode_enum.cycle
+                else operation_mode_enum.cycle
+            ),
+            "buzzer": not device.buzzer,
+            "humidity_boost_running": not device.humidity_boost_running,
+            "humidity_boost_level": device.humidity_boost_level % 90 + 1,
+        }
+    )
+
+
+def test_update_fan_out(hass_entry, measure, loop):
+    hass, entry = hass_entry
+    coordinator = entry.runtime_data.coordinator
+    variants = itertools.cycle(
+        [
+            {group_id: changed_copy(device) for group_id, device in coordinator.data.items()},
+            dict(coordinator.data),
+        ]
+    )
+
+    def fan_out():
+        coordinator.async_set_updated_data(next(variants))
+        loop.run_until_complete(hass.async_block_till_done())
+
+    states = []
+    unsubscribe = hass.bus.async_listen("state_changed", states.append)
+    fan_out()
+    unsubscribe()
+    # every platform writes at least one entity per device
+    platforms = {state.data["entity_id"].split(".")[0] for state in states}
+    assert platforms == {"binary_sensor", "fan", "number", "select", "sensor", "switch"}
+
+    measure(fan_out, ROUNDS)
+
+
+def test_poll(hass_entry, measure, loop):
+    hass, entry = hass_entry
+    coordinator = entry.runtime_data.coordinator
+
+    def poll():
+        loop.run_until_complete(coordinator.async_refresh())
+        loop.run_until_complete(hass.async_block_till_done())
+
+    measure(poll, ROUNDS)
+    assert coordinator.last_update_success
@@ -0,0 +1,26 @@
+"""Shared setup of the tests.
+
+Run with: pip install -r requirements_test.txt && pytest
+
+The component modules are imported as the bsk_zephyr_lan package without
+running its __init__, so the modules that do not use Home Assistant are
+tested without it. The tools (simulator, status pages) are on sys.path.
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TOOLS_DIR = ROOT / "tools"
+COMPONENT_DIR = ROOT / "custom_components" / "bsk_zephyr_lan"
+PAGES = sorted((TOOLS_DIR / "status_pages").glob("*.html"))
+
+sys.path.insert(0, str(TOOLS_DIR))
+
+if "bsk_zephyr_lan" not in sys.modules:
+    _package = types.ModuleType("bsk_zephyr_lan")
+    _package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules["bsk_zephyr_lan"] = _package
@@ -0,0 +1,95 @@
+"""Circuit breaker state transitions, on a fake clock and without jitter."""
+
+from __future__ import annotations
+
+import pytest
+
+from bsk_zephyr_lan import circuit_breaker
+from bsk_zephyr_lan.circuit_breaker import CircuitBreaker, CircuitState
+
+ERROR = ConnectionError("unreachable")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        "test", failure_threshold=2, base_delay=10, max_delay=30, jitter=0
+    )
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure(ERROR)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    assert breaker.allow_request()
+    breaker.record_failure(ERROR)
+    assert breaker.state is CircuitState.closed
+    # a success in between resets the count
+    breaker.record_success()
+    breaker.record_failure(ERROR)
+    assert breaker.state is CircuitState.closed
+    breaker.record_failure(ERROR)
+    assert breaker.state is CircuitState.open
+    assert breaker.opened == 1
+
+
+def test_open_rejects_until_the_retry_time(breaker, clock):
+    open_breaker(breaker)
+    assert breaker.retry_in == 10
+    assert not breaker.allow_request()
+    clock.now += 9.9
+    assert not breaker.allow_request()
+    assert breaker.rejected == 2
+
+
+def test_half_open_lets_a_single_probe_through(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.half_open
+    assert not breaker.allow_request()
+    # a cancelled probe lets the next request probe
+    breaker.record_cancelled()
+    assert breaker.allow_request()
+
+
+def test_failed_probes_double_the_delay_up_to_the_maximum(breaker, clock):
+    open_breaker(breaker)
+    for expected in (20, 30, 30):
+        clock.now += breaker.retry_in
+        assert breaker.allow_request()
+        breaker.record_failure(ERROR)
+        assert breaker.state is CircuitState.open
+        assert breaker.retry_in == expected
+
+
+def test_successful_probe_closes_and_resets_the_delay(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_failure(ERROR)
+    clock.now += 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.closed
+    assert breaker.failures == 0
+    open_breaker(breaker)
+    assert breaker.retry_in == 10
@@ -0,0 +1,94 @@
+"""Command planning from the cached state, with the firmware quirks."""
+
+from __future__ import annotations
+
+import pytest
+
+from bsk_zephyr_lan.capabilities import resolve_capabilities
+from bsk_zephyr_lan.command_planner import plan_commands
+
+DISABLED_LEVEL = 99
+
+STATE = {
+    "power": True,
+    "operation_mode": "Cycle",
+    "fan_speed": 30,
+    "humidity_boost_level_raw": DISABLED_LEVEL,
+    "humidity_boost_running": False,
+    "buzzer": False,
+    "humidity": 50.0,
+}
+
+
+def paths(state, target, **kwargs):
+    return [
+        command.path for command in plan_commands(state, target, DISABLED_LEVEL, **kwargs)
+    ]
+
+
+def test_target_already_reached():
+    assert paths(STATE, {"power": True, "operation_mode": "cycle", "fan_speed": 30}) == []
+
+
+def test_power_on_first_then_settings():
+    state = {**STATE, "power": False}
+    commands = plan_commands(
+        state, {"power": True, "operation_mode": "supply", "fan_speed": 55}, DISABLED_LEVEL
+    )
+    assert [command.path for command in commands] == ["/on", "/intake", "/fan"]
+    assert commands[1].expected == {"operation_mode": "intake"}
+    assert commands[2].data == {"speed": 55}
+
+
+def test_mode_matches_the_status_page_value():
+    # the page reports the supply mode as Intake
+    assert paths({**STATE, "operation_mode": "Intake"}, {"operation_mode": "supply"}) == []
+
+
+def test_boost_disabled_at_any_level_from_the_disabled_one():
+    state = {**STATE, "humidity_boost_level_raw": 100}
+    assert paths(state, {"humidity_boost_level_raw": DISABLED_LEVEL}) == []
+    assert paths(state, {"humidity_boost_level_raw": 60}) == ["/humid"]
+
+
+def test_buzzer_state_form():
+    commands = plan_commands(STATE, {"buzzer": True}, DISABLED_LEVEL)
+    assert [(command.path, command.data) for command in commands] == [
+        ("/buzzer", {"state": 1})
+    ]
+
+
+@pytest.mark.parametrize(
+    ("firmware", "expected"),
+    [
+        ("3.1.4", ["/humid", "/off", "/on"]),
+        ("3.1.5", ["/humid", "/off", "/on"]),
+        ("3.1.5b1", ["/humid", "/off", "/on"]),
+        ("3.1.6", ["/humid"]),
+        ("unknown", ["/humid"]),
+    ],
+)
+def test_boost_restart_quirk(firmware, expected):
+    capabilities = resolve_capabilities("BSK-Zephyr-Mini-V1.0", firmware)
+    state = {**STATE, "humidity_boost_level_raw": 60, "humidity_boost_running": True}
+    assert (
+        paths(
+            state,
+            {"humidity_boost_level_raw": 70},
+            restart_on_boost_change=capabilities.restart_boost_on_level_change,
+        )
+        == expected
+    )
+
+
+def test_boost_restart_only_when_it_must_stop():
+    state = {**STATE, "humidity_boost_level_raw": 60, "humidity_boost_running": True}
+    # a set point below the humidity keeps the boost running anyway
+    assert paths(state, {"humidity_boost_level_raw": 40}, restart_on_boost_change=True) == [
+        "/humid"
+    ]
+    # nothing to restart when the boost is not running
+    state["humidity_boost_running"] = False
+    assert paths(state, {"humidity_boost_level_raw": 70}, restart_on_boost_change=True) == [
+        "/humid"
+    ]
@@ -0,0 +1,44 @@
+"""Poll slots of the fleet: one shared cycle, whatever the member intervals."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from bsk_zephyr_lan import fleet  # noqa: E402
+
+NOW = 1003.7
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(fleet.time, "monotonic", lambda: NOW)
+    scheduler = fleet.FleetPollScheduler(cycle_length=10)
+    for index in range(4):
+        scheduler.async_register(f"entry_{index}")
+    return scheduler
+
+
+@pytest.mark.parametrize("interval", [10, 15, 23.5, 60])
+def test_members_poll_in_their_slot(scheduler, interval):
+    for index in range(4):
+        delay = scheduler.next_poll_delay(f"entry_{index}", interval)
+        assert (NOW + delay) % 10 == pytest.approx(index * 2.5, abs=1e-6)
+        assert abs(delay - interval) <= 5
+
+
+def test_short_interval_never_halved_further(scheduler):
+    for index in range(4):
+        assert scheduler.next_poll_delay(f"entry_{index}", 2) >= 1
+
+
+def test_unscheduled_members_keep_their_interval(monkeypatch):
+    monkeypatch.setattr(fleet.time, "monotonic", lambda: NOW)
+    scheduler = fleet.FleetPollScheduler()
+    scheduler.async_register("alone")
+    assert scheduler.next_poll_delay("alone", 30) == 30
+    scheduler.async_register("other")
+    assert scheduler.next_poll_delay("unknown", 30) == 30
+    scheduler.async_unregister("other")
+    assert scheduler.next_poll_delay("alone", 30) == 30
@@ -0,0 +1,60 @@
+"""Status page parser: the readings of the legacy parser, decoded in one pass."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from bench_parser import legacy_parse
+from bsk_zephyr_lan.status_parser import StatusPageParser
+
+PAGES = sorted((Path(__file__).resolve().parents[1] / "tools" / "status_pages").glob("*.html"))
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_parse_matches_legacy(page):
+    html = page.read_text(encoding="utf-8")
+    data = StatusPageParser().parse(html)
+
+    assert data == legacy_parse(html)
+    assert StatusPageParser.is_valid(data)
+    # the integer fields are not floats as in the legacy parser
+    assert isinstance(data["wifi_rssi"], int)
+    assert isinstance(data["fan_speed"], int)
+
+
+def test_parse_units_and_unknown_labels():
+    html = (
+        "<p><b>Temperature:</b> 70.5 °F</p>"
+        "<p><b>Fan Speed:</b> 55 %</p>"
+        "<p><b>Power:</b> 1</p>"
+        "<p><b>Night Light:</b> off</p>"
+    )
+    assert StatusPageParser().parse(html) == {
+        "temperature": 70.5,
+        "temperature_unit": "°F",
+        "fan_speed": 55,
+        "fan_speed_unit": "%",
+        "power": True,
+        "night_light": "off",
+    }
+
+
+def test_parse_mapping_accepts_labels_and_targets():
+    parser = StatusPageParser()
+    data = parser.parse_mapping(
+        {"Fan Speed": "30 %", "power": 1, "humidity_boost_level_raw": 60, "result": "ok"}
+    )
+    assert data == {
+        "fan_speed": 30,
+        "fan_speed_unit": "%",
+        "power": True,
+        "humidity_boost_level_raw": 60,
+    }
+    assert parser.is_status_field("humidity_boost_level_raw")
+    assert not parser.is_status_field("fan_speed_unit")
+
+
+def test_is_valid_requires_a_zephyr_reading():
+    assert not StatusPageParser.is_valid(StatusPageParser().parse("<p><b>Uptime:</b> 5</p>"))
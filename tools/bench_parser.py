@@ -0,0 +1,104 @@
+"""Measure the per-poll cost of parsing the Zephyr status page.
+
+Usage: python tools/bench_parser.py [--number N] [page.html ...]
+
+Without pages, all the recorded pages in tools/status_pages are used.
+The legacy column is the regex + if-chain parser used before status_parser.py,
+kept here only as a reference point.
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = Path(__file__).resolve().parent / "status_pages"
+
+
+def load_status_parser():
+    path = ROOT / "custom_components" / "bsk_zephyr_lan" / "status_parser.py"
+    spec = importlib.util.spec_from_file_location("status_parser", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_parse(html: str) -> dict:
+    def to_bool(v):
+        return v.strip().lower() in ("1", "true", "on", "yes")
+
+    def parse_value(key, value):
+        unit = None
+        v = value.strip()
+        if key in ("power", "buzzer", "humidity_boost_running"):
+            return to_bool(v), unit
+        for unit in ["°C", "°F", "%", "dBm", "h"]:
+            if v.endswith(unit) and v.endswith(f" {unit}"):
+                try:
+                    numeric_part = float(v.replace(unit, "").strip())
+                    if unit in ("h"):
+                        numeric_part = int(numeric_part)
+                    return numeric_part, unit
+                except ValueError:
+                    return v, None
+        if key in ("fan_speed", "humidity_boost_level_raw", "hygiene_status"):
+            try:
+                return int(v), None
+            except ValueError:
+                return v, None
+        return v, None
+
+    data = {}
+    for okey, value in re.findall(r"<p><b>([^<:]+):<\/b>(.*?)<\/p>", html):
+        key = okey.strip().lower().replace(" ", "_")
+        if key in ("ssid", "rssi", "ip"):
+            key = f"wifi_{key}"
+        if key in ("version", "model"):
+            key = f"device_{key}"
+        if key == "set_humidity":
+            key = "humidity_boost_level_raw"
+        if key == "humidity_boost":
+            key = "humidity_boost_running"
+        data[key], unit = parse_value(key, value)
+        if unit:
+            data[f"{key}_unit"] = unit
+    return data
+
+
+def bench(func, html: str, number: int) -> float:
+    """Return the best time per call in microseconds."""
+    times = timeit.repeat(lambda: func(html), number=number, repeat=5)
+    return min(times) / number * 1e6
+
+
+def main() -> int:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("pages", nargs="*", type=Path)
+    argparser.add_argument("--number", type=int, default=20000)
+    args = argparser.parse_args()
+
+    status_parser = load_status_parser()
+    parser = status_parser.StatusPageParser()
+    pages = args.pages or sorted(PAGES_DIR.glob("*.html"))
+
+    print(f"{'page':<28}{'bytes':>8}{'fields':>8}{'legacy us':>12}{'parser us':>12}{'speedup':>9}")
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        data = parser.parse(html)
+        if not parser.is_valid(data):
+            print(f"{page.name}: not a Zephyr status page", file=sys.stderr)
+            return 1
+        legacy = bench(legacy_parse, html, args.number)
+        current = bench(parser.parse, html, args.number)
+        print(
+            f"{page.name:<28}{len(html):>8}{len(data):>8}"
+            f"{legacy:>12.2f}{current:>12.2f}{legacy / current:>8.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Load a Home Assistant instance with a fleet of simulated Zephyr units.
+
+Usage: python tools/fleet_load.py [--devices N] [--interval S] [--duration S] [--json FILE]
+
+Starts N simulated units in a separate process (tools/zephyr_simulator.py),
+then one config entry per unit in a throwaway Home Assistant instance
+(tools/ha_instance.py), each with all its fan, sensor, number, select,
+switch and binary_sensor entities, polled every --interval seconds.
+After --warmup seconds it measures for --duration seconds:
+
+  loop CPU per cycle    CPU time of the event loop thread per poll cycle
+                        (--interval seconds, one poll of every unit)
+  loop busy             the same as a fraction of the wall time
+  process CPU per cycle including the executor threads
+  loop lag              how late a sleep of LAG_SAMPLE_INTERVAL wakes up
+  memory per device     RSS grown from the bare instance, divided by N
+
+--json writes the same numbers, to compare a change against a baseline.
+
+Requires aiohttp, pydantic and homeassistant.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from ha_instance import async_add_entry, ha_instance
+
+SIMULATOR = Path(__file__).resolve().parent / "zephyr_simulator.py"
+
+# Seconds between two samples of the loop lag
+LAG_SAMPLE_INTERVAL = 0.05
+# Options of the entries, fixed interval so every cycle polls every unit
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop runs a sleeping task."""
+
+    def __init__(self) -> None:
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.lags.append(time.perf_counter() - start - LAG_SAMPLE_INTERVAL)
+
+    def start(self) -> None:
+        self.lags.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+def rss() -> int:
+    """Resident memory of the process in bytes."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak instead of current, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def raise_open_files_limit() -> None:
+    """Every unit holds a socket in both processes, the default 1024 is not enough."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and (hard == resource.RLIM_INFINITY or soft < hard):
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def start_simulator(args: argparse.Namespace) -> tuple[asyncio.subprocess.Process, list[str]]:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(SIMULATOR),
+        "--count", str(args.devices),
+        "--base-port", "0",
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    addresses = []
+    while len(addresses) < args.devices:
+        line = await process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Simulator exited with {await process.wait()}")
+        addresses.append(line.decode().strip())
+    return process, addresses
+
+
+def percentile(values: list[float], percent: int) -> float:
+    return statistics.quantiles(values, n=100)[percent - 1] if len(values) > 1 else values[0]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    process, addresses = await start_simulator(args)
+    try:
+        async with ha_instance() as hass:
+            gc.collect()
+            rss_before = rss()
+            options = {
+                CONF_MIN_POLL_INTERVAL: args.interval,
+                CONF_MAX_POLL_INTERVAL: args.interval,
+            }
+            setup_start = time.perf_counter()
+            entries = []
+            for index, address in enumerate(addresses):
+                # the simulator numbers the units from 0
+                device_id = f"5CCF7F{index:06X}"
+                entries.append(await async_add_entry(hass, {device_id: address}, options))
+            setup_time = time.perf_counter() - setup_start
+            print(
+                f"{len(entries)} entries set up in {setup_time:.1f} s, warming up",
+                file=sys.stderr,
+            )
+            await asyncio.sleep(args.warmup)
+
+            clients = [
+                client
+                for entry in entries
+                for client in entry.runtime_data.coordinator.clients.values()
+            ]
+            requests_before = sum(client.connection_stats["requests"] for client in clients)
+            monitor = LoopLagMonitor()
+            monitor.start()
+            wall_start = time.perf_counter()
+            loop_cpu_start = time.thread_time()
+            process_cpu_start = time.process_time()
+            await asyncio.sleep(args.duration)
+            loop_cpu = time.thread_time() - loop_cpu_start
+            process_cpu = time.process_time() - process_cpu_start
+            wall = time.perf_counter() - wall_start
+            monitor.stop()
+            requests = sum(client.connection_stats["requests"] for client in clients)
+
+            gc.collect()
+            cycles = wall / args.interval
+            lags = monitor.lags
+            return {
+                "devices": args.devices,
+                "entities": len(hass.states.async_all()),
+                "interval": args.interval,
+                "setup_s": round(setup_time, 2),
+                "requests_per_cycle": round((requests - requests_before) / cycles, 1),
+                "failed_devices": sum(
+                    len(entry.runtime_data.coordinator.failed_devices) for entry in entries
+                ),
+                "loop_cpu_per_cycle_ms": round(loop_cpu / cycles * 1000, 2),
+                "loop_busy_percent": round(loop_cpu / wall * 100, 2),
+                "process_cpu_per_cycle_ms": round(process_cpu / cycles * 1000, 2),
+                "loop_lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+                "loop_lag_p95_ms": round(percentile(lags, 95) * 1000, 2),
+                "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+                "loop_lag_max_ms": round(max(lags) * 1000, 2),
+                "memory_per_device_kib": round((rss() - rss_before) / args.devices / 1024, 1),
+            }
+    finally:
+        process.terminate()
+        await process.wait()
+
+
+def main() -> int:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--devices", type=int, default=100)
+    argparser.add_argument("--interval", type=float, default=10.0, help="poll interval, seconds")
+    argparser.add_argument("--warmup", type=float, default=30.0, help="seconds before measuring")
+    argparser.add_argument("--duration", type=float, default=60.0, help="seconds measured")
+    argparser.add_argument("--latency", type=float, default=0.0, help="simulated Wi-Fi latency")
+    argparser.add_argument("--jitter", type=float, default=0.0)
+    argparser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    raise_open_files_limit()
+    results = asyncio.run(run(args))
+    width = max(len(key) for key in results)
+    for key, value in results.items():
+        print(f"{key:<{width}}  {value}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Run the integration inside a throwaway Home Assistant instance.
+
+Used by the benchmarks in tests/benchmarks and by the load tools, not meant
+to be run directly.
+The instance is bootstrapped by hand, without frontend and recorder: only
+the core, the config entries and the integration under test are set up.
+
+Requires homeassistant (pip install homeassistant).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from homeassistant import auth, bootstrap, config_entries, loader
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+ROOT = Path(__file__).resolve().parent.parent
+DOMAIN = "bsk_zephyr_lan"
+# Not the default 8123, a real instance may be running on the same machine
+HTTP_PORT = 18123
+
+
+@contextlib.asynccontextmanager
+async def ha_instance(http_port: int = HTTP_PORT) -> AsyncIterator[HomeAssistant]:
+    """Yield a running instance with the integration installed, stop it at exit.
+
+    The http component, a dependency of the integration, listens on
+    127.0.0.1:http_port.
+    """
+    with tempfile.TemporaryDirectory(prefix="bsk_zephyr_ha_") as config_dir:
+        components = Path(config_dir) / "custom_components"
+        components.mkdir()
+        (components / DOMAIN).symlink_to(ROOT / "custom_components" / DOMAIN)
+        (Path(config_dir) / "configuration.yaml").write_text("")
+
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+        hass.auth = await auth.auth_manager_from_config(hass, [{"type": "homeassistant"}], [])
+        await async_setup_component(
+            hass, "http", {"http": {"server_host": ["127.0.0.1"], "server_port": http_port}}
+        )
+        await async_setup_component(hass, "homeassistant", {})
+        await hass.async_start()
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+async def async_add_entry(
+    hass: HomeAssistant, devices: dict[str, str], options: dict | None = None
+) -> config_entries.ConfigEntry:
+    """Add and set up an entry for devices, device id to host:port."""
+    device_id, host = next(iter(devices.items()))
+    entry = config_entries.ConfigEntry(
+        domain=DOMAIN,
+        title=f"Zephyr {device_id}",
+        data={"host": host, "devices": dict(devices)},
+        source=config_entries.SOURCE_USER,
+        version=1,
+        minor_version=1,
+        options=options or {},
+        unique_id=device_id,
+        discovery_keys={},
+        subentries_data=None,
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    if entry.state is not config_entries.ConfigEntryState.LOADED:
+        raise RuntimeError(f"Entry for {device_id} not loaded: {entry.state} {entry.reason}")
+    return entry
@@ -0,0 +1,273 @@
+"""Simulate BSK Zephyr units on the local machine.
+
+Usage: python tools/zephyr_simulator.py [--count N] [--latency S] [--drop-rate R] ...
+
+Every unit listens on its own port of --host and serves the status page plus
+the /on, /off, /fan, /humid, /buzzer, /cycle, /intake and /exhaust commands,
+like the real firmware. The addresses are printed one per line, ready to be
+pasted in the config flow. Other tools import start_units() to run the units
+inside their own event loop.
+
+Requires aiohttp (pip install aiohttp).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+# Set humidity from this value up means the boost is disabled
+BOOST_DISABLED_LEVEL = 99
+FAN_SPEED_RANGE = (22, 80)
+HUMIDITY_RANGE = (35, 100)
+# Last firmware that keeps the boost running when the set point is raised
+BOOST_QUIRK_VERSION = (3, 1, 5)
+
+
+@dataclass
+class UnitOptions:
+    """Behaviour of the simulated network and firmware."""
+
+    model: str = "BSK-Zephyr-Mini-V1_4MB"
+    version: str = "3.1.5"
+    # seconds added to every response, plus a random 0..jitter
+    latency: float = 0.0
+    jitter: float = 0.0
+    # fraction of the requests whose connection is closed without answering
+    drop_rate: float = 0.0
+    # like the ESP firmware: one request at a time, the others wait
+    single_connection: bool = True
+    # the command responses report the new state, not only the result
+    report_state: bool = False
+
+
+@dataclass
+class SimulatedZephyr:
+    device_id: str
+    ip: str
+    options: UnitOptions = field(default_factory=UnitOptions)
+    power: bool = True
+    fan_speed: int = 30
+    operation_mode: str = "Cycle"
+    set_humidity: int = 60
+    humidity_boost: bool = False
+    buzzer: bool = True
+    temperature: float = 21.0
+    humidity: float = 55.0
+    rssi: int = -60
+    filter_timer: int = 1432
+    hygiene_status: int = 71
+    requests: int = 0
+    dropped: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self._rng = random.Random(self.device_id)
+        self.has_boost_quirk = (
+            tuple(int(part) for part in self.options.version.split(".")[:3])
+            <= BOOST_QUIRK_VERSION
+        )
+
+    # --- device behaviour ---
+
+    def tick(self) -> None:
+        """Drift the readings a little, as a real room does between two polls."""
+        self.temperature = round(self.temperature + self._rng.uniform(-0.05, 0.05), 2)
+        self.humidity = round(
+            min(95.0, max(30.0, self.humidity + self._rng.uniform(-0.3, 0.3))), 2
+        )
+        self.rssi = self._rng.randint(-72, -55)
+        self._evaluate_boost()
+
+    def _evaluate_boost(self, restart: bool = False) -> None:
+        wanted = (
+            self.power
+            and self.set_humidity < BOOST_DISABLED_LEVEL
+            and self.humidity > self.set_humidity
+        )
+        if self.humidity_boost and self.has_boost_quirk and not restart:
+            # firmware bug: once running the boost ignores the set point until a power cycle
+            return
+        self.humidity_boost = wanted
+
+    def command(self, path: str, form: dict[str, str]) -> dict[str, str]:
+        """Apply a command, return the fields it changed as page labels."""
+        if path == "/on":
+            self.power = True
+            self._evaluate_boost(restart=True)
+            return {"Power": "ON", "Humidity Boost": str(int(self.humidity_boost))}
+        if path == "/off":
+            self.power = False
+            self.humidity_boost = False
+            return {"Power": "OFF", "Humidity Boost": "0"}
+        if path == "/fan":
+            self.fan_speed = min(max(int(form["speed"]), FAN_SPEED_RANGE[0]), FAN_SPEED_RANGE[1])
+            return {"Fan Speed": str(self.fan_speed)}
+        if path == "/humid":
+            level = min(max(int(form["level"]), HUMIDITY_RANGE[0]), HUMIDITY_RANGE[1])
+            self.set_humidity = level
+            self._evaluate_boost()
+            return {"Set Humidity": str(level), "Humidity Boost": str(int(self.humidity_boost))}
+        if path == "/buzzer":
+            self.buzzer = form.get("state") == "1"
+            return {"Buzzer": str(int(self.buzzer))}
+        if path in ("/cycle", "/intake", "/exhaust"):
+            self.operation_mode = path[1:].capitalize()
+            return {"Operation Mode": self.operation_mode}
+        raise KeyError(path)
+
+    def status_page(self) -> str:
+        lines = (
+            ("Device ID", self.device_id),
+            ("Version", self.options.version),
+            ("Model", self.options.model),
+            ("SSID", "bsk.wlan1"),
+            ("RSSI", f"{self.rssi} dBm"),
+            ("IP", self.ip),
+            ("Power", "ON" if self.power else "OFF"),
+            ("Fan Speed", self.fan_speed),
+            ("Temperature", f"{self.temperature} °C"),
+            ("Humidity", f"{self.humidity} %"),
+            ("Operation Mode", self.operation_mode),
+            ("Set Humidity", self.set_humidity),
+            ("Humidity Boost", int(self.humidity_boost)),
+            ("Buzzer", int(self.buzzer)),
+            ("Filter Timer", f"{self.filter_timer} h"),
+            ("Hygiene Status", self.hygiene_status),
+        )
+        rows = "\n".join(f"<p><b>{label}:</b> {value}</p>" for label, value in lines)
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"UTF-8\">\n"
+            "<title>BSK Zephyr Device Control</title>\n</head>\n<body>\n"
+            "<h1>Welcome to BSK Zephyr Home Assistant</h1>\n"
+            f"<div class=\"card\">\n<h2>Device Info</h2>\n{rows}\n</div>\n"
+            "</body>\n</html>\n"
+        )
+
+    # --- HTTP ---
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._network])
+        app.router.add_get("/", self._handle_status)
+        for path in ("/on", "/off", "/fan", "/humid", "/buzzer", "/cycle", "/intake", "/exhaust"):
+            app.router.add_post(path, self._handle_command)
+        return app
+
+    @web.middleware
+    async def _network(self, request: web.Request, handler):
+        self.requests += 1
+        if self.options.single_connection:
+            async with self._lock:
+                return await self._answer(request, handler)
+        return await self._answer(request, handler)
+
+    async def _answer(self, request: web.Request, handler):
+        options = self.options
+        delay = options.latency + self._rng.uniform(0, options.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if options.drop_rate and self._rng.random() < options.drop_rate:
+            self.dropped += 1
+            if request.transport is not None:
+                request.transport.close()
+            # nothing reaches the client, the connection is already closed
+            return web.Response(status=204)
+        return await handler(request)
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        self.tick()
+        return web.Response(text=self.status_page(), content_type="text/html")
+
+    async def _handle_command(self, request: web.Request) -> web.Response:
+        form = dict(await request.post())
+        try:
+            changed = self.command(request.path, form)
+        except (KeyError, ValueError) as err:
+            return web.json_response({"result": "error", "error": str(err)}, status=400)
+        body = {"result": "ok"}
+        if self.options.report_state:
+            body.update(changed)
+        return web.json_response(body)
+
+
+async def start_units(
+    count: int, host: str = "127.0.0.1", base_port: int = 0, options: UnitOptions | None = None
+) -> tuple[list[web.AppRunner], list[SimulatedZephyr], list[str]]:
+    """Start count units, return their runners, units and host:port addresses.
+
+    base_port 0 lets the system pick a free port for every unit.
+    """
+    options = options or UnitOptions()
+    runners, units, addresses = [], [], []
+    for index in range(count):
+        unit = SimulatedZephyr(f"5CCF7F{index:06X}", host, options)
+        runner = web.AppRunner(unit.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, base_port + index if base_port else 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        runners.append(runner)
+        units.append(unit)
+        addresses.append(f"{host}:{port}")
+    return runners, units, addresses
+
+
+async def stop_units(runners: list[web.AppRunner]) -> None:
+    await asyncio.gather(*(runner.cleanup() for runner in runners))
+
+
+async def run(args: argparse.Namespace) -> None:
+    options = UnitOptions(
+        model=args.model,
+        version=args.version,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        single_connection=not args.parallel,
+        report_state=args.report_state,
+    )
+    runners, units, addresses = await start_units(args.count, args.host, args.base_port, options)
+    print("\n".join(addresses), flush=True)
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval or 3600)
+            if args.stats_interval:
+                requests = sum(unit.requests for unit in units)
+                dropped = sum(unit.dropped for unit in units)
+                print(f"requests={requests} dropped={dropped}", file=sys.stderr, flush=True)
+    finally:
+        await stop_units(runners)
+
+
+def main() -> int:
+    argparser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argparser.add_argument("--count", type=int, default=1)
+    argparser.add_argument("--host", default="127.0.0.1")
+    argparser.add_argument("--base-port", type=int, default=8100, help="0 picks free ports")
+    argparser.add_argument("--model", default=UnitOptions.model)
+    argparser.add_argument("--version", default=UnitOptions.version)
+    argparser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    argparser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds")
+    argparser.add_argument("--drop-rate", type=float, default=0.0, help="0..1")
+    argparser.add_argument(
+        "--parallel", action="store_true", help="answer concurrent requests in parallel"
+    )
+    argparser.add_argument(
+        "--report-state", action="store_true", help="commands answer with the new state"
+    )
+    argparser.add_argument("--stats-interval", type=float, default=0.0)
+    args = argparser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())